@@ -3,16 +3,28 @@ InterATS Backend - Main Flask Application
 Production-ready ATS Score Checker API
 """
 
+import time
+
+_import_started = time.perf_counter()
+
+import gc
 import os
-from flask import Flask, request, jsonify
+import json
+import sqlite3
+import tempfile
+from flask import Flask, Response, g, request, jsonify, abort
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 import traceback
 
+# Light services only; scoring (numpy/scipy) and Gemini are imported by their factories below
 from services.resume_parser import ResumeParser
-from services.ats_scorer import ATSScorer
-from services.gemini_analyzer import GeminiAnalyzer
+from services.job_queue import QueueFullError
+from services.result_cache import ResultCache
+from services.lazy import LazyService, startup_report
+from services.metrics import REGISTRY, SIZE_BUCKETS, request_timings, stage, start_request_timing
+from services.profiler import SamplingProfiler
 
 # Load environment variables
 load_dotenv()
@@ -22,17 +34,233 @@ app = Flask(__name__)
 CORS(app)
 
 # Configuration
-app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_FILE_SIZE', 5242880))  # 5MB default
-app.config['UPLOAD_FOLDER'] = 'uploads'
-ALLOWED_EXTENSIONS = set(os.getenv('ALLOWED_EXTENSIONS', 'pdf,docx').split(','))
-
-# Create uploads directory if it doesn't exist
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 5242880))  # 5MB default
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 104857600))  # 100MB default
+# Batch uploads need the larger limit; single uploads are checked in limit_upload_size
+app.config['MAX_CONTENT_LENGTH'] = max(MAX_FILE_SIZE, MAX_BATCH_SIZE)
 
 # Initialize services
-resume_parser = ResumeParser()
-ats_scorer = ATSScorer()
-gemini_analyzer = GeminiAnalyzer(api_key=os.getenv('GEMINI_API_KEY'))
+result_cache = ResultCache(
+    max_bytes=int(os.getenv('RESULT_CACHE_MAX_BYTES', 67108864)),  # 64MB default
+    ttl=int(os.getenv('RESULT_CACHE_TTL', 86400)),
+    disk_dir=os.getenv('RESULT_CACHE_DIR') or None,
+    disk_max_bytes=int(os.getenv('RESULT_CACHE_DISK_MAX_BYTES', 1073741824)),  # 1GB default
+    disk_sweep_interval=int(os.getenv('RESULT_CACHE_DISK_SWEEP_INTERVAL', 300))
+)
+parser_options = {
+    'pdf_workers': int(os.getenv('PDF_WORKERS', 1)),
+    'max_pages': int(os.getenv('PDF_MAX_PAGES', 0)) or None,
+    'max_chars': int(os.getenv('PDF_MAX_CHARS', 0)) or None,
+    'fast_pdf': os.getenv('PDF_FAST_MODE', 'False').lower() == 'true',
+    'normalize_unicode': os.getenv('PARSER_NFKC', 'False').lower() == 'true',
+    'dehyphenate': os.getenv('PARSER_DEHYPHENATE', 'True').lower() == 'true'
+}
+resume_parser = ResumeParser(**parser_options)
+# Every format the parser's extractor registry handles, unless narrowed in .env
+ALLOWED_EXTENSIONS = set(
+    (os.getenv('ALLOWED_EXTENSIONS') or ','.join(resume_parser.registry.extensions())).split(',')
+)
+INVALID_FILE_TYPE = f"Invalid file type. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}"
+
+# Instrumentation: Server-Timing header with per-stage durations, and an
+# on-demand sampling profiler (send 'X-Profile: 1' with a request)
+SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'False').lower() == 'true'
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILE_DIR = os.getenv('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'interats_profiles')
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL_MS', 5)) / 1000
+
+# Gunicorn workers merge their metrics through a SQLite file, so /metrics
+# reports host-wide totals whichever worker answers the scrape; on by
+# default only under gunicorn.conf.py, so scripts and tests stay local
+if os.getenv('METRICS_SHARED', 'False').lower() == 'true':
+    REGISTRY.share(
+        os.getenv('METRICS_DB_PATH') or os.path.join(tempfile.gettempdir(), 'interats_metrics.db'),
+        flush_interval=float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+    )
+
+# Editing sessions ask Gemini again only once the resume has changed this
+# much since the last suggestions: score points, or share of changed text
+SESSION_RESUGGEST_SCORE_DELTA = int(os.getenv('SESSION_RESUGGEST_SCORE_DELTA', 5))
+SESSION_RESUGGEST_CHANGE = float(os.getenv('SESSION_RESUGGEST_CHANGE', 0.2))
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'interats_request_seconds', 'Request latency, streamed bodies included', ['endpoint']
+)
+RESPONSES = REGISTRY.counter(
+    'interats_responses_total', 'Responses by endpoint and status code', ['endpoint', 'status']
+)
+UPLOADS = REGISTRY.counter(
+    'interats_uploads_total', 'Parsed uploads by detected file type', ['file_type']
+)
+UPLOAD_BYTES = REGISTRY.histogram(
+    'interats_upload_bytes', 'Size of parsed uploads', ['file_type'], buckets=SIZE_BUCKETS
+)
+ERRORS = REGISTRY.counter(
+    'interats_errors_total', 'Analyses that failed with an exception', ['endpoint', 'error']
+)
+
+
+def build_ats_scorer():
+    """ATS scorer with the default taxonomy and JD matcher"""
+    from services.ats_scorer import ATSScorer
+    from services.jd_matcher import JobDescriptionMatcher
+    return ATSScorer(
+        jd_matcher=JobDescriptionMatcher(corpus_stats_path=os.getenv('JD_CORPUS_STATS') or None)
+    )
+
+
+def build_taxonomy_registry():
+    """Taxonomy registry falling back to the scorer's built-in taxonomy"""
+    from services.taxonomy import TaxonomyRegistry
+    return TaxonomyRegistry(
+        directory=os.getenv('TAXONOMY_DIR'),
+        default=ats_scorer.taxonomy,
+        check_interval=float(os.getenv('TAXONOMY_CHECK_INTERVAL', 5))
+    )
+
+
+def build_gemini_analyzer(model=None):
+    """
+    Gemini analyzer with the configured deadlines, retries and batching
+    
+    Args:
+        model: Optional generate_content stand-in (benchmarks and load tests
+            pass services.fake_gemini.FakeGeminiModel); the real model is
+            used when omitted
+    """
+    from services.gemini_analyzer import GeminiAnalyzer
+    from services.llm_client import CircuitBreaker
+    from services.llm_scheduler import LLMScheduler
+    
+    # API quota shared by every worker on the host; off unless configured,
+    # since the right limits depend on the account's tier
+    requests_per_minute = int(os.getenv('GEMINI_RPM') or 0)
+    tokens_per_minute = int(os.getenv('GEMINI_TPM') or 0)
+    scheduler = None
+    if requests_per_minute or tokens_per_minute:
+        print(
+            f"Gemini rate limits: {requests_per_minute or 'unlimited'} requests/min, "
+            f"{tokens_per_minute or 'unlimited'} tokens/min (GEMINI_RPM, GEMINI_TPM)"
+        )
+        scheduler = LLMScheduler(
+            requests_per_minute,
+            tokens_per_minute,
+            db_path=os.getenv('GEMINI_SCHEDULER_DB') or None,
+            max_wait={
+                'interactive': float(os.getenv('GEMINI_QUEUE_WAIT', 5)),
+                'batch': float(os.getenv('GEMINI_BATCH_QUEUE_WAIT', 10))
+            }
+        )
+    
+    return GeminiAnalyzer(
+        api_key=os.getenv('GEMINI_API_KEY'),
+        model=model,
+        cache=result_cache,
+        timeout=float(os.getenv('GEMINI_TIMEOUT', 15)),
+        max_concurrency=int(os.getenv('GEMINI_MAX_CONCURRENCY', 8)),
+        max_retries=int(os.getenv('GEMINI_MAX_RETRIES', 2)),
+        breaker=CircuitBreaker(
+            failure_rate=float(os.getenv('GEMINI_BREAKER_FAILURE_RATE', 0.5)),
+            cooldown=float(os.getenv('GEMINI_BREAKER_COOLDOWN', 30))
+        ),
+        batch_size=int(os.getenv('GEMINI_BATCH_SIZE', 8)),
+        batch_max_tokens=int(os.getenv('GEMINI_BATCH_MAX_TOKENS', 12000)),
+        prompt_tokens=int(os.getenv('GEMINI_PROMPT_TOKENS', 800)),
+        scheduler=scheduler
+    )
+
+
+def build_batch_analyzer():
+    """Process-pool batch analyzer"""
+    from services.batch_analyzer import BatchAnalyzer
+    
+    # Every server worker gets its own pool, so split the cores between them
+    # (gunicorn.conf.py exports its worker count as WEB_CONCURRENCY)
+    server_workers = int(os.getenv('WEB_CONCURRENCY') or 1)
+    max_workers = int(os.getenv('BATCH_WORKERS', 0)) or max(1, (os.cpu_count() or 1) // server_workers)
+    
+    return BatchAnalyzer(
+        max_workers=max_workers,
+        max_files=int(os.getenv('MAX_BATCH_FILES', 500)),
+        max_file_size=MAX_FILE_SIZE,
+        cache=result_cache,
+        parser_options=parser_options
+    )
+
+
+def build_job_queue():
+    """Background job queue (opens its SQLite database)"""
+    from services.job_queue import JobQueue
+    return JobQueue(
+        db_path=os.getenv('JOB_DB_PATH'),
+        workers=int(os.getenv('JOB_WORKERS', 2)),
+        max_pending=int(os.getenv('JOB_MAX_PENDING', 50)),
+        result_ttl=int(os.getenv('JOB_RESULT_TTL', 3600)),
+        stale_after=int(os.getenv('JOB_STALE_AFTER', 1800))
+    )
+
+
+def build_resume_store():
+    """Resume store at RESUME_STORE_PATH"""
+    from services.resume_store import ResumeStore
+    return ResumeStore(os.getenv('RESUME_STORE_PATH'))
+
+
+def build_session_store():
+    """Editing session state in SQLite (SESSION_DB_PATH)"""
+    from services.session_store import SessionStore
+    return SessionStore(
+        db_path=os.getenv('SESSION_DB_PATH'),
+        ttl=int(os.getenv('SESSION_TTL', 3600))
+    )
+
+
+# Built on first use, so a cold process serves /health without importing
+# numpy, scipy or the Gemini SDK, and SQLite connections are never opened
+# before a fork
+ats_scorer = LazyService('ats_scorer', build_ats_scorer)
+taxonomy_registry = LazyService('taxonomy_registry', build_taxonomy_registry)
+gemini_analyzer = LazyService('gemini_analyzer', build_gemini_analyzer)
+batch_analyzer = LazyService('batch_analyzer', build_batch_analyzer)
+job_queue = LazyService('job_queue', build_job_queue)
+session_store = LazyService('session_store', build_session_store)
+# Optional persistent store of parsed resumes for skill search and re-scoring
+resume_store = LazyService('resume_store', build_resume_store) if os.getenv('RESUME_STORE_PATH') else None
+LAZY_SERVICES = [
+    service for service in (
+        ats_scorer, taxonomy_registry, gemini_analyzer, batch_analyzer, job_queue, session_store, resume_store
+    )
+    if service is not None
+]
+
+
+def warmup():
+    """
+    Build the CPU-side services and compile their patterns ahead of traffic
+    
+    Meant for the gunicorn master with preload_app: everything built here is
+    shared by the forked workers copy-on-write. The job queue, session and
+    resume stores are left alone since their SQLite connections must not
+    cross a fork.
+    """
+    sample = resume_parser.parse_text(
+        'Jane Doe\njane@example.com\nSummary\nPython developer\n'
+        'Experience\nBuilt APIs with Flask and PostgreSQL\nSkills\nPython, SQL, Docker'
+    )
+    ats_scorer.calculate_score(sample)
+    ats_scorer.calculate_score(sample, job_description='Python developer with Flask and SQL')
+    # Compile every named taxonomy here rather than on the first request in each worker
+    taxonomy_registry.preload()
+    gemini_analyzer.instance()
+    batch_analyzer.instance()
+    # Keep the warmed objects out of later collections; otherwise the
+    # collector's writes to their headers un-share the pages in each worker
+    gc.collect()
+    gc.freeze()
+
+
+# Endpoints allowed to receive more than MAX_FILE_SIZE per request
+BATCH_ENDPOINTS = {'analyze_batch', 'rank_resumes'}
 
 
 def allowed_file(filename):
@@ -40,16 +268,246 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def read_upload(file):
+    """Read an uploaded file into memory (timed as the 'upload' stage)"""
+    with stage('upload'):
+        return file.read()
+
+
+def parse_upload(data):
+    """Parse uploaded bytes, reusing the cached result for identical files"""
+    # The parser version and options are part of the key, so a config change
+    # or parser upgrade never serves parses in an older shape
+    parse_key = result_cache.make_key(result_cache.hash_bytes(data), resume_parser.fingerprint())
+    parsed_data = result_cache.get('parsed', parse_key)
+    
+    if parsed_data is None:
+        parsed_data = resume_parser.parse(data)
+        result_cache.set('parsed', parse_key, parsed_data)
+    
+    file_type = parsed_data.get('file_type', 'unknown')
+    UPLOADS.inc(file_type=file_type)
+    UPLOAD_BYTES.observe(len(data), file_type=file_type)
+    return parsed_data
+
+
+def report_error(endpoint, message, error):
+    """Log an analysis failure with its traceback and count it"""
+    print(f"{message}: {str(error)}")
+    print(traceback.format_exc())
+    ERRORS.inc(endpoint=endpoint, error=type(error).__name__)
+
+
+def index_resume(parsed_data, filename=None):
+    """Add a parsed resume to the resume store, if one is configured"""
+    if resume_store is None:
+        return
+    
+    try:
+        keywords = sorted(ats_scorer.keyword_matcher.find_present(parsed_data['text'].lower()))
+        resume_store.add(parsed_data, keywords, filename=filename)
+    except Exception as e:
+        # Indexing is best-effort and must never fail the analysis itself
+        print(f"Error indexing resume: {str(e)}")
+
+
+def wants_explanation():
+    """Whether the client asked for match offsets ('explain=true' form or query field)"""
+    return request.values.get('explain', 'false').lower() == 'true'
+
+
+def build_score_result(parsed_data, taxonomy, job_description=None, explain=False):
+    """
+    Score a parsed resume, optionally against a job description
+    
+    Args:
+        explain: Also return the scorer's explanation (match offsets and
+            per-component details) and the cleaned text its offsets index
+    
+    Returns:
+        dict: Response payload without AI suggestions
+    """
+    # Step 2: Calculate ATS score and identify skills (cached per text, taxonomy version and JD)
+    score_key = result_cache.make_key(
+        result_cache.hash_bytes(parsed_data['text'].encode('utf-8')),
+        taxonomy.name,
+        taxonomy.version,
+        result_cache.hash_bytes((job_description or '').encode('utf-8'))
+    )
+    ats_result = result_cache.get('score', score_key)
+    
+    # Disk-cached scores written before explanations existed count as misses
+    if ats_result is None or 'explanation' not in ats_result:
+        ats_result = ats_scorer.calculate_score(
+            parsed_data,
+            taxonomy=taxonomy,
+            job_description=job_description
+        )
+        result_cache.set('score', score_key, ats_result)
+    
+    return score_payload(parsed_data, ats_result, explain)
+
+
+def score_payload(parsed_data, ats_result, explain=False):
+    """Response payload for an ATS scorer result (without AI suggestions)"""
+    response = {
+        'success': True,
+        'ats_score': ats_result['score'],
+        'matched_skills': ats_result['matched_skills'],
+        'missing_skills': ats_result['missing_skills'],
+        'score_breakdown': ats_result['breakdown'],
+        'sections_detected': parsed_data['sections'],
+        'section_spans': parsed_data.get('section_spans', []),
+        'taxonomy': ats_result['taxonomy']
+    }
+    
+    if 'job_match' in ats_result:
+        response['job_match'] = ats_result['job_match']
+    
+    if explain:
+        response['explanation'] = ats_result['explanation']
+        response['text'] = parsed_data['text']
+    
+    return response
+
+
+def add_suggestions(response, parsed_data):
+    """Attach AI-powered suggestions to a score payload"""
+    # Step 3: Get AI-powered suggestions from Gemini
+    ai_suggestions = gemini_analyzer.analyze_resume(
+        resume_text=parsed_data['text'],
+        sections=parsed_data['sections'],
+        ats_score=response['ats_score'],
+        breakdown=response['score_breakdown'],
+        missing_skills=response['missing_skills'],
+        section_spans=parsed_data['section_spans']
+    )
+    response['suggestions'] = ai_suggestions['suggestions']
+    return response
+
+
+def build_analysis(parsed_data, taxonomy, job_description=None, explain=False):
+    """
+    Score a parsed resume and collect AI suggestions
+    
+    Returns:
+        dict: Response payload shared by the single, batch and job endpoints
+    """
+    return add_suggestions(build_score_result(parsed_data, taxonomy, job_description, explain), parsed_data)
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def run_analysis_job(job, data, taxonomy, job_description=None, filename=None, explain=False):
+    """Background job: publish the ATS score first, then the AI suggestions"""
+    with job.stage('parse'):
+        parsed_data = parse_upload(data)
+    
+    if not parsed_data['text'].strip():
+        raise ValueError('Could not extract text from resume')
+    
+    index_resume(parsed_data, filename)
+    
+    with job.stage('score'):
+        response = build_score_result(parsed_data, taxonomy, job_description, explain)
+    job.update(response)
+    
+    with job.stage('suggestions'):
+        add_suggestions(response, parsed_data)
+    
+    return response
+
+
+@app.before_request
+def limit_upload_size():
+    """Apply the single-file size limit everywhere except batch endpoints"""
+    if request.endpoint not in BATCH_ENDPOINTS and (request.content_length or 0) > MAX_FILE_SIZE:
+        abort(413)
+
+
+@app.before_request
+def start_instrumentation():
+    """Start the request clock, stage timings and (if asked for) the profiler"""
+    g.request_started = time.perf_counter()
+    start_request_timing()
+    REGISTRY.start()
+    
+    g.profiler = None
+    if PROFILING_ENABLED and request.headers.get('X-Profile'):
+        g.profiler = SamplingProfiler(interval=PROFILE_INTERVAL).start()
+
+
+@app.after_request
+def finish_instrumentation(response):
+    """Record latency once the body is sent; add Server-Timing and profile headers"""
+    endpoint = request.endpoint or 'unknown'
+    started = g.get('request_started', time.perf_counter())
+    profiler = g.get('profiler')
+    RESPONSES.inc(endpoint=endpoint, status=response.status_code)
+    
+    if SERVER_TIMING:
+        # Streamed responses only include the stages finished before the first byte
+        timings = request_timings()
+        timings.append(('total', time.perf_counter() - started))
+        response.headers['Server-Timing'] = ', '.join(
+            f'{name};dur={elapsed * 1000:.1f}' for name, elapsed in timings
+        )
+    
+    profile_path = None
+    if profiler is not None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profile_path = os.path.join(PROFILE_DIR, f'{int(time.time() * 1000)}-{endpoint}-{os.getpid()}.folded')
+        response.headers['X-Profile'] = os.path.basename(profile_path)
+    
+    def on_close():
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+        if profiler is not None:
+            profiler.stop().write(profile_path)
+            hottest = ', '.join(f'{name} {share:.0%}' for name, share in profiler.top(5))
+            print(f"Profiled {endpoint}: {profiler.samples} samples in {profiler.duration * 1000:.0f} ms -> {profile_path} ({hottest})")
+    
+    response.call_on_close(on_close)
+    return response
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
         'service': 'InterATS API',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'startup': startup_report(LAZY_SERVICES, STARTUP_MS)
     }), 200
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage latencies, request latencies and counters in Prometheus text format"""
+    return Response(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/api/taxonomies', methods=['GET'])
+def list_taxonomies():
+    """List the keyword taxonomies that can be selected per request"""
+    return jsonify({'taxonomies': taxonomy_registry.names()}), 200
+
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report result cache hit/miss counters and memory usage"""
+    return jsonify(result_cache.stats()), 200
+
+
+@app.route('/api/llm/stats', methods=['GET'])
+def llm_stats():
+    """Report Gemini latency, timeouts, retries, fallbacks and circuit breaker state"""
+    return jsonify(gemini_analyzer.metrics()), 200
+
+
 @app.route('/api/analyze-resume', methods=['POST'])
 def analyze_resume():
     """
@@ -69,51 +527,529 @@ def analyze_resume():
             return jsonify({'error': 'No file selected'}), 400
         
         if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Only PDF and DOCX allowed'}), 400
+            return jsonify({'error': INVALID_FILE_TYPE}), 400
+        
+        # Pick the keyword taxonomy for the target role (built-in by default)
+        try:
+            taxonomy = taxonomy_registry.get(request.form.get('taxonomy'))
+        except KeyError as e:
+            return jsonify({'error': 'Unknown taxonomy', 'details': str(e)}), 400
+        except (ValueError, OSError) as e:
+            return jsonify({'error': 'Taxonomy unavailable', 'details': str(e)}), 503
         
-        # Save file temporarily
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # Step 1: Parse resume to extract text and sections
+        parsed_data = parse_upload(read_upload(file))
         
+        if not parsed_data['text'].strip():
+            return jsonify({'error': 'Could not extract text from resume'}), 400
+        
+        index_resume(parsed_data, secure_filename(file.filename))
+        
+        response = build_analysis(parsed_data, taxonomy, request.form.get('job_description'), wants_explanation())
+        
+        return jsonify(response), 200
+    
+    except Exception as e:
+        report_error('analyze_resume', "Error analyzing resume", e)
+        return jsonify({
+            'error': 'Failed to analyze resume',
+            'details': str(e)
+        }), 500
+
+
+@app.route('/api/analyze-resume/stream', methods=['POST'])
+def analyze_resume_stream():
+    """
+    Streaming variant of /api/analyze-resume using Server-Sent Events
+    
+    Events, in order:
+        parsed: detected sections, word count and extraction info
+        score: the /api/analyze-resume payload without suggestions
+        suggestion: {'index', 'text'} for each AI suggestion as it arrives
+        done: the complete /api/analyze-resume payload
+        error: {'error', 'details'} if analysis fails after streaming began
+    """
+    if 'resume' not in request.files:
+        return jsonify({'error': 'No resume file provided'}), 400
+    
+    file = request.files['resume']
+    
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    if not allowed_file(file.filename):
+        return jsonify({'error': INVALID_FILE_TYPE}), 400
+    
+    try:
+        taxonomy = taxonomy_registry.get(request.form.get('taxonomy'))
+    except KeyError as e:
+        return jsonify({'error': 'Unknown taxonomy', 'details': str(e)}), 400
+    except (ValueError, OSError) as e:
+        return jsonify({'error': 'Taxonomy unavailable', 'details': str(e)}), 503
+    
+    filename = secure_filename(file.filename)
+    data = read_upload(file)
+    job_description = request.form.get('job_description')
+    explain = wants_explanation()
+    
+    def generate():
         try:
-            # Step 1: Parse resume to extract text and sections
-            parsed_data = resume_parser.parse(filepath)
-            
+            parsed_data = parse_upload(data)
             if not parsed_data['text'].strip():
-                return jsonify({'error': 'Could not extract text from resume'}), 400
+                yield sse_event('error', {'error': 'Could not extract text from resume'})
+                return
+            
+            yield sse_event('parsed', {
+                'sections_detected': parsed_data['sections'],
+                'section_spans': parsed_data.get('section_spans', []),
+                'word_count': parsed_data['word_count'],
+                'file_type': parsed_data.get('file_type'),
+                'extraction': parsed_data.get('extraction', {})
+            })
             
-            # Step 2: Calculate ATS score and identify skills
-            ats_result = ats_scorer.calculate_score(parsed_data)
+            index_resume(parsed_data, filename)
             
-            # Step 3: Get AI-powered suggestions from Gemini
-            ai_suggestions = gemini_analyzer.analyze_resume(
+            response = build_score_result(parsed_data, taxonomy, job_description, explain)
+            yield sse_event('score', response)
+            
+            response['suggestions'] = []
+            for suggestion in gemini_analyzer.stream_suggestions(
                 resume_text=parsed_data['text'],
                 sections=parsed_data['sections'],
-                ats_score=ats_result['score']
-            )
+                ats_score=response['ats_score'],
+                breakdown=response['score_breakdown'],
+                missing_skills=response['missing_skills'],
+                section_spans=parsed_data['section_spans']
+            ):
+                yield sse_event('suggestion', {'index': len(response['suggestions']), 'text': suggestion})
+                response['suggestions'].append(suggestion)
             
-            # Combine results
-            response = {
-                'success': True,
-                'ats_score': ats_result['score'],
-                'matched_skills': ats_result['matched_skills'],
-                'missing_skills': ats_result['missing_skills'],
-                'suggestions': ai_suggestions['suggestions'],
-                'score_breakdown': ats_result['breakdown'],
-                'sections_detected': parsed_data['sections']
+            yield sse_event('done', response)
+        
+        except Exception as e:
+            report_error('analyze_resume_stream', "Error analyzing resume", e)
+            yield sse_event('error', {'error': 'Failed to analyze resume', 'details': str(e)})
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/analyze-batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analyze many resumes in one request
+    
+    Accepts a multipart list of files under 'resumes' and/or a zip archive
+    under 'archive'. Parsing runs in a process pool and each file's result
+    is streamed back as one NDJSON line as soon as it finishes.
+    
+    Returns:
+        NDJSON stream; each line has the same shape as /api/analyze-resume
+        plus 'filename' (or 'success': false with an 'error')
+    """
+    try:
+        uploads = []
+        for file in request.files.getlist('resumes'):
+            if file.filename == '':
+                continue
+            filename = secure_filename(file.filename)
+            if not allowed_file(filename):
+                uploads.append((filename, None, INVALID_FILE_TYPE))
+            else:
+                uploads.append((filename, file.read(MAX_FILE_SIZE + 1), None))
+        
+        archive = request.files.get('archive')
+        if archive and archive.filename:
+            uploads.extend(batch_analyzer.read_archive(archive.stream, allowed_file))
+        
+        if not uploads:
+            return jsonify({'error': 'No resume files provided'}), 400
+        
+        try:
+            taxonomy = taxonomy_registry.get(request.form.get('taxonomy'))
+        except KeyError as e:
+            return jsonify({'error': 'Unknown taxonomy', 'details': str(e)}), 400
+        except (ValueError, OSError) as e:
+            return jsonify({'error': 'Taxonomy unavailable', 'details': str(e)}), 503
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    job_description = request.form.get('job_description')
+    
+    def flush(scored):
+        """Fetch suggestions for scored resumes in packed Gemini requests"""
+        suggestions = gemini_analyzer.analyze_batch([
+            {
+                'id': index,
+                'text': parsed_data['text'],
+                'sections': parsed_data['sections'],
+                'ats_score': result['ats_score'],
+                'breakdown': result['score_breakdown'],
+                'missing_skills': result['missing_skills'],
+                'section_spans': parsed_data['section_spans']
             }
+            for index, (_, parsed_data, result) in enumerate(scored)
+        ])
+        for index, (filename, _, result) in enumerate(scored):
+            result['suggestions'] = suggestions[index]['suggestions']
+            result['filename'] = filename
+            yield json.dumps(result) + '\n'
+    
+    def generate():
+        # Scored resumes wait here until a full Gemini batch is ready
+        scored = []
+        for filename, parsed_data, error in batch_analyzer.parse_all(uploads):
+            if error is None and not parsed_data['text'].strip():
+                error = 'Could not extract text from resume'
+            
+            if error is None:
+                index_resume(parsed_data, filename)
+                try:
+                    scored.append((filename, parsed_data, build_score_result(parsed_data, taxonomy, job_description)))
+                except Exception as e:
+                    report_error('analyze_batch', f"Error analyzing resume {filename}", e)
+                    error = str(e)
             
-            return jsonify(response), 200
+            if error is not None:
+                yield json.dumps({'success': False, 'error': error, 'filename': filename}) + '\n'
+            
+            if len(scored) >= gemini_analyzer.batch_size:
+                yield from flush(scored)
+                scored = []
+        
+        if scored:
+            yield from flush(scored)
+    
+    return Response(generate(), mimetype='application/x-ndjson')
+
+
+@app.route('/api/resumes/search', methods=['GET'])
+def search_resumes():
+    """
+    Search stored resumes by skills
+    
+    Query parameters:
+        q: Skill query with AND / OR / NOT, parentheses and "quoted phrases"
+        limit, offset: Pagination (limit defaults to 20, max 100)
+    """
+    if resume_store is None:
+        return jsonify({'error': 'Resume store is not enabled'}), 400
+    
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    offset = request.args.get('offset', 0, type=int)
+    
+    try:
+        results = resume_store.search(query, limit=limit, offset=offset)
+    except (ValueError, sqlite3.OperationalError) as e:
+        return jsonify({'error': 'Invalid search query', 'details': str(e)}), 400
+    
+    return jsonify({'success': True, 'query': query, 'results': results}), 200
+
+
+@app.route('/api/rank', methods=['POST'])
+def rank_resumes():
+    """
+    Rank many already-parsed resumes against one job in a single pass
+    
+    Expects JSON:
+        {"resumes": [{"id": ..., "text": ..., "sections": {...}, "word_count": ...}],
+         "job_description": "...", "taxonomy": "...", "top_k": 50}
+    Resumes given only as text are cleaned and segmented first. With
+    "from_store": true (and an optional skill "query") the stored resumes
+    are ranked instead of the "resumes" list.
+    
+    Returns:
+        JSON with the top-k resumes, best first, and their score breakdowns
+    """
+    try:
+        payload = request.get_json(silent=True) or {}
+        resumes = payload.get('resumes')
+        
+        if payload.get('from_store'):
+            if resume_store is None:
+                return jsonify({'error': 'Resume store is not enabled'}), 400
+            try:
+                resumes = list(resume_store.iter_parsed(payload.get('query')))
+            except (ValueError, sqlite3.OperationalError) as e:
+                return jsonify({'error': 'Invalid search query', 'details': str(e)}), 400
+            if not resumes:
+                return jsonify({'success': True, 'total': 0, 'results': []}), 200
+        
+        if not isinstance(resumes, list) or not resumes:
+            return jsonify({'error': 'No resumes provided'}), 400
+        
+        # An integer (or integer string) of at least 1; booleans and floats are rejected
+        top_k = payload.get('top_k', 50)
+        try:
+            top_k = 0 if isinstance(top_k, (bool, float)) else int(top_k)
+        except (TypeError, ValueError):
+            top_k = 0
+        if top_k < 1:
+            return jsonify({'error': 'top_k must be a positive integer'}), 400
+        
+        try:
+            taxonomy = taxonomy_registry.get(payload.get('taxonomy'))
+        except KeyError as e:
+            return jsonify({'error': 'Unknown taxonomy', 'details': str(e)}), 400
+        except (ValueError, OSError) as e:
+            return jsonify({'error': 'Taxonomy unavailable', 'details': str(e)}), 503
+        
+        parsed_resumes = []
+        for index, resume in enumerate(resumes):
+            if not isinstance(resume, dict) or not isinstance(resume.get('text'), str):
+                return jsonify({'error': f'Resume at index {index} has no text'}), 400
             
-        finally:
-            # Clean up uploaded file
-            if os.path.exists(filepath):
-                os.remove(filepath)
+            if 'sections' in resume and 'word_count' in resume:
+                parsed_data = dict(resume)
+            else:
+                parsed_data = resume_parser.parse_text(resume['text'])
+            parsed_data['id'] = resume.get('id', index)
+            parsed_resumes.append(parsed_data)
+        
+        ranking = ats_scorer.rank_resumes(
+            parsed_resumes,
+            taxonomy=taxonomy,
+            job_description=payload.get('job_description'),
+            top_k=min(top_k, len(parsed_resumes))
+        )
+        
+        return jsonify({
+            'success': True,
+            'total': len(parsed_resumes),
+            'results': ranking,
+            'taxonomy': {'name': taxonomy.name, 'version': taxonomy.version}
+        }), 200
+    
+    except Exception as e:
+        report_error('rank_resumes', "Error ranking resumes", e)
+        return jsonify({
+            'error': 'Failed to rank resumes',
+            'details': str(e)
+        }), 500
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_analysis_job():
+    """
+    Queue a resume analysis and return immediately
+    
+    Returns:
+        202 with the job id; poll /api/jobs/<job_id> for progress
+    """
+    if 'resume' not in request.files:
+        return jsonify({'error': 'No resume file provided'}), 400
+    
+    file = request.files['resume']
+    
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    filename = secure_filename(file.filename)
+    if not allowed_file(filename):
+        return jsonify({'error': INVALID_FILE_TYPE}), 400
+    
+    try:
+        taxonomy = taxonomy_registry.get(request.form.get('taxonomy'))
+    except KeyError as e:
+        return jsonify({'error': 'Unknown taxonomy', 'details': str(e)}), 400
+    except (ValueError, OSError) as e:
+        return jsonify({'error': 'Taxonomy unavailable', 'details': str(e)}), 503
+    
+    try:
+        job_id = job_queue.submit(
+            run_analysis_job,
+            read_upload(file),
+            taxonomy,
+            request.form.get('job_description'),
+            filename,
+            wants_explanation()
+        )
+    except QueueFullError as e:
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    """
+    Poll a queued analysis
+    
+    Returns:
+        JSON with status (queued, running, completed, failed), the partial or
+        final result (ATS score first, suggestions once ready) and stage timings
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job), 200
+
+
+def parse_session_input():
+    """
+    Parse the resume of a session request: an uploaded 'resume' file, or
+    the edited plain 'text' (which skips extraction entirely)
+    
+    Returns:
+        tuple: (parsed_data, None) or (None, error message)
+    """
+    if request.form.get('text') is not None:
+        parsed_data = resume_parser.parse_text(request.form['text'])
+    else:
+        file = request.files.get('resume')
+        if file is None or file.filename == '':
+            return None, 'No resume file or text provided'
+        if not allowed_file(file.filename):
+            return None, INVALID_FILE_TYPE
+        parsed_data = parse_upload(read_upload(file))
+    
+    if not parsed_data['text'].strip():
+        return None, 'Could not extract text from resume'
+    return parsed_data, None
+
+
+@app.route('/api/sessions', methods=['POST'])
+def start_session():
+    """
+    Analyze a resume and open an editing session for it
+    
+    Returns:
+        JSON like /api/analyze-resume plus 'session_id' and 'revision';
+        post edited versions to /api/sessions/<session_id>
+    """
+    try:
+        try:
+            taxonomy = taxonomy_registry.get(request.form.get('taxonomy'))
+        except KeyError as e:
+            return jsonify({'error': 'Unknown taxonomy', 'details': str(e)}), 400
+        except (ValueError, OSError) as e:
+            return jsonify({'error': 'Taxonomy unavailable', 'details': str(e)}), 503
+        
+        parsed_data, error = parse_session_input()
+        if error:
+            return jsonify({'error': error}), 400
+        
+        job_description = request.form.get('job_description')
+        ats_result, scan_state, _ = ats_scorer.rescore(parsed_data, taxonomy=taxonomy, job_description=job_description)
+        response = add_suggestions(score_payload(parsed_data, ats_result, wants_explanation()), parsed_data)
+        
+        session_id = session_store.create({
+            'revision': 1,
+            # As requested: None means the registry default
+            'taxonomy': request.form.get('taxonomy'),
+            'job_description': job_description,
+            'scan': scan_state,
+            'score': ats_result['score'],
+            'breakdown': ats_result['breakdown'],
+            'sections': parsed_data['sections'],
+            'suggestions': response['suggestions'],
+            'suggested_score': ats_result['score'],
+            'drift': 0.0
+        })
+        
+        response['session_id'] = session_id
+        response['revision'] = 1
+        return jsonify(response), 200
     
     except Exception as e:
-        print(f"Error analyzing resume: {str(e)}")
-        print(traceback.format_exc())
+        report_error('start_session', "Error starting session", e)
+        return jsonify({
+            'error': 'Failed to analyze resume',
+            'details': str(e)
+        }), 500
+
+
+@app.route('/api/sessions/<session_id>', methods=['POST'])
+def rescore_session(session_id):
+    """
+    Re-score an edited version of a session's resume
+    
+    Only the lines that changed since the previous revision are scanned
+    again. Gemini is asked for new suggestions only when the score or text
+    has moved far enough since the last ones; otherwise they are reused.
+    
+    Returns:
+        JSON like /api/analyze-resume plus 'score_delta' and
+        'breakdown_delta' (against the previous revision), 'changes',
+        'suggestions_refreshed' and 'revision'
+    """
+    try:
+        state = session_store.get(session_id)
+        if state is None:
+            return jsonify({'error': 'Session not found or expired'}), 404
+        
+        try:
+            taxonomy = taxonomy_registry.get(state['taxonomy'])
+        except KeyError as e:
+            return jsonify({'error': 'Unknown taxonomy', 'details': str(e)}), 400
+        except (ValueError, OSError) as e:
+            return jsonify({'error': 'Taxonomy unavailable', 'details': str(e)}), 503
+        
+        parsed_data, error = parse_session_input()
+        if error:
+            return jsonify({'error': error}), 400
+        
+        job_description = request.form.get('job_description', state['job_description'])
+        ats_result, scan_state, changes = ats_scorer.rescore(
+            parsed_data, state['scan'], taxonomy=taxonomy, job_description=job_description
+        )
+        response = score_payload(parsed_data, ats_result, wants_explanation())
+        
+        # A rescan is skipped (changes is None) when the taxonomy changed
+        drift = state['drift'] + (changes['changed_fraction'] if changes else 1.0)
+        refresh = (
+            changes is None
+            or abs(ats_result['score'] - state['suggested_score']) >= SESSION_RESUGGEST_SCORE_DELTA
+            or drift >= SESSION_RESUGGEST_CHANGE
+            or parsed_data['sections'] != state['sections']
+            or job_description != state['job_description']
+        )
+        if refresh:
+            add_suggestions(response, parsed_data)
+        else:
+            response['suggestions'] = state['suggestions']
+        
+        revision = state['revision'] + 1
+        session_store.save(session_id, {
+            'revision': revision,
+            'taxonomy': state['taxonomy'],
+            'job_description': job_description,
+            'scan': scan_state,
+            'score': ats_result['score'],
+            'breakdown': ats_result['breakdown'],
+            'sections': parsed_data['sections'],
+            'suggestions': response['suggestions'],
+            'suggested_score': ats_result['score'] if refresh else state['suggested_score'],
+            'drift': 0.0 if refresh else drift
+        })
+        
+        response.update({
+            'session_id': session_id,
+            'revision': revision,
+            'score_delta': ats_result['score'] - state['score'],
+            'breakdown_delta': {
+                name: value - state['breakdown'].get(name, 0)
+                for name, value in ats_result['breakdown'].items()
+            },
+            'changes': changes,
+            'suggestions_refreshed': refresh
+        })
+        return jsonify(response), 200
+    
+    except Exception as e:
+        report_error('rescore_session', "Error re-scoring session", e)
         return jsonify({
             'error': 'Failed to analyze resume',
             'details': str(e)
@@ -129,10 +1065,17 @@ def request_entity_too_large(error):
 @app.errorhandler(500)
 def internal_server_error(error):
     """Handle internal server errors"""
+    original = getattr(error, 'original_exception', None) or error
+    ERRORS.inc(endpoint=request.endpoint or 'unknown', error=type(original).__name__)
     return jsonify({'error': 'Internal server error'}), 500
 
 
+STARTUP_MS = round((time.perf_counter() - _import_started) * 1000, 1)
+print(f"InterATS API loaded in {STARTUP_MS} ms")
+
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
-    debug = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+    # Development server only; production runs under gunicorn (gunicorn.conf.py)
+    debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,293 @@
+"""
+Pipeline Benchmark
+Per-stage and end-to-end latency of the resume analysis pipeline
+
+Parses, scores and analyzes a deterministic synthetic corpus (see
+benchmarks/corpus.py) with Gemini replaced by a stub that sleeps for a
+configurable latency, then runs the same files through the Flask test
+client. Reports throughput and p50/p95/p99 per stage as JSON, and can
+compare against a previous run to catch regressions.
+
+Usage (from the backend folder):
+    python -m benchmarks.bench_pipeline --output results.json
+    python -m benchmarks.bench_pipeline --compare results.json --threshold 0.1
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import build_corpus
+from services.fake_gemini import FakeGeminiModel
+from services.metrics import request_timings, start_request_timing
+
+
+JOB_DESCRIPTION = (
+    'We are hiring a backend engineer with python, django, postgresql and aws experience. '
+    'Kubernetes, docker and ci/cd are a plus; strong communication and mentoring skills.'
+)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def summarize(samples):
+    """
+    Latency summary of one stage
+
+    Args:
+        samples: Durations in seconds
+
+    Returns:
+        dict: count, throughput per second and mean/min/max/p50/p95/p99 in ms
+    """
+    values = sorted(samples)
+    total = sum(values)
+    return {
+        'count': len(values),
+        'throughput_per_s': round(len(values) / total, 2) if total else 0.0,
+        'mean_ms': round(total / len(values) * 1000, 3) if values else 0.0,
+        'min_ms': round(values[0] * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0
+    }
+
+
+class StageRecorder:
+    """Collects durations per stage name across runs"""
+
+    def __init__(self, warmup=1):
+        """
+        Args:
+            warmup: Leading runs of each measurement that are discarded
+                (lazy imports, regex compilation, cold caches)
+        """
+        self.warmup = warmup
+        self.samples = {}
+        self._seen = {}
+
+    def time(self, name, func, *args, **kwargs):
+        """
+        Run func, recording its duration under `name` and the duration of
+        every services.metrics stage it went through under `name.stage`
+        (e.g. 'parse.pdf.parse_extract')
+
+        Returns:
+            The return value of func
+        """
+        start_request_timing()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        self._seen[name] = self._seen.get(name, 0) + 1
+        if self._seen[name] > self.warmup:
+            self.samples.setdefault(name, []).append(elapsed)
+            for stage, stage_elapsed in request_timings():
+                self.samples.setdefault(f'{name}.{stage}', []).append(stage_elapsed)
+        return result
+
+    def results(self):
+        """Summaries for every recorded stage, sorted by name"""
+        return {name: summarize(samples) for name, samples in sorted(self.samples.items())}
+
+
+def bench_components(corpus, recorder, repeat, gemini_latency, gemini_jitter):
+    """Time parsing, scoring, prompt building and the (stubbed) Gemini call directly"""
+    from services.ats_scorer import ATSScorer
+    from services.gemini_analyzer import GeminiAnalyzer
+    from services.resume_parser import ResumeParser
+
+    parser = ResumeParser()
+    scorer = ATSScorer()
+    analyzer = GeminiAnalyzer(
+        api_key=None,
+        model=FakeGeminiModel(gemini_latency, gemini_jitter),
+        timeout=max(5.0, gemini_latency * 10)
+    )
+
+    for _ in range(repeat):
+        for item in corpus:
+            parsed = recorder.time(f"parse.{item['format']}", parser.parse, item['data'])
+            result = recorder.time('score', scorer.calculate_score, parsed)
+            recorder.time('score.job_description', scorer.calculate_score, parsed, job_description=JOB_DESCRIPTION)
+            # Edit loop: one added line, re-scored from the previous revision's matches
+            _, state, _ = scorer.rescore(parsed)
+            edited = parser.parse_text(parsed['text'] + '\nReduced deploy time by 40% with docker and terraform')
+            recorder.time('rescore.edit', scorer.rescore, edited, state)
+            recorder.time(
+                'prompt_build',
+                analyzer._build_analysis_prompt,
+                parsed['text'], parsed['sections'], result['score'], result['breakdown'], result['missing_skills'],
+                parsed['section_spans']
+            )
+
+    # Gemini calls are slow by construction; once per file is enough
+    for item in corpus:
+        parsed = parser.parse(item['data'])
+        result = scorer.calculate_score(parsed)
+        recorder.time(
+            'gemini.analyze_resume',
+            analyzer.analyze_resume,
+            parsed['text'], parsed['sections'], result['score'], result['breakdown'], result['missing_skills'],
+            section_spans=parsed['section_spans']
+        )
+
+
+def bench_end_to_end(corpus, recorder, gemini_latency, gemini_jitter, use_cache=False):
+    """Post every file to /api/analyze-resume and its streaming variant through the Flask test client"""
+    if not use_cache:
+        os.environ['RESULT_CACHE_MAX_BYTES'] = '0'
+    os.environ['METRICS_SERVER_TIMING'] = 'False'
+    os.environ['PROFILING_ENABLED'] = 'False'
+
+    import app as application
+    from services.gemini_analyzer import GeminiAnalyzer
+    from services.lazy import LazyService
+
+    model = FakeGeminiModel(gemini_latency, gemini_jitter)
+    # Routes read the module global at call time, so swapping it reroutes every call
+    application.gemini_analyzer = LazyService(
+        'gemini_analyzer',
+        lambda: GeminiAnalyzer(api_key=None, model=model, timeout=max(5.0, gemini_latency * 10))
+    )
+    client = application.app.test_client()
+
+    def post(path, item):
+        response = client.post(
+            path,
+            data={'resume': (io.BytesIO(item['data']), item['name'])},
+            content_type='multipart/form-data'
+        )
+        body = response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code} for {item['name']}: {body[:200]!r}")
+        return body
+
+    for item in corpus:
+        recorder.time('e2e.analyze_resume', post, '/api/analyze-resume', item)
+        recorder.time('e2e.analyze_resume_stream', post, '/api/analyze-resume/stream', item)
+
+
+def environment():
+    """Commit, interpreter and machine details stored with every run"""
+    def git(*args):
+        try:
+            return subprocess.run(
+                ['git', *args], capture_output=True, text=True, timeout=10
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    return {
+        'commit': git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    }
+
+
+def compare(results, baseline, threshold, metric='p50_ms'):
+    """
+    Compare one latency metric against a previous run
+
+    Stages faster than 0.05 ms are skipped; timer noise dominates there.
+    Tail percentiles of small runs are noisy, so p50 is the default gate.
+
+    Returns:
+        list: (stage, metric, old ms, new ms, relative change) for every
+            regression above the threshold
+    """
+    regressions = []
+    print(f"\n{'stage':<52} {'baseline':>10} {'current':>10} {'change':>8}   ({metric})")
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        old, new = previous[metric], current[metric]
+        if max(old, new) < 0.05:
+            continue
+        change = (new - old) / old if old else 0.0
+        flag = ' !' if change > threshold else ''
+        print(f"{name:<52} {old:>10.3f} {new:>10.3f} {change:>+7.1%}{flag}")
+        if change > threshold:
+            regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--count', type=int, default=24, help='Synthetic resumes in the corpus')
+    parser.add_argument('--seed', type=int, default=1, help='Corpus seed')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over the corpus for the local stages')
+    parser.add_argument('--warmup', type=int, default=1, help='Leading runs per stage that are discarded')
+    parser.add_argument('--gemini-latency', type=float, default=0.3, help='Mean stub Gemini latency in seconds')
+    parser.add_argument('--gemini-jitter', type=float, default=0.1, help='Stub latency jitter in seconds')
+    parser.add_argument('--skip-e2e', action='store_true', help='Only time the components directly')
+    parser.add_argument('--cache', action='store_true', help='Keep the result cache on in the end-to-end runs')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline JSON from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown that counts as a regression')
+    parser.add_argument('--metric', default='p50_ms', choices=['mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'],
+                        help='Metric compared against the baseline')
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.count, args.seed)
+    recorder = StageRecorder(warmup=args.warmup)
+
+    bench_components(corpus, recorder, args.repeat, args.gemini_latency, args.gemini_jitter)
+    if not args.skip_e2e:
+        bench_end_to_end(corpus, recorder, args.gemini_latency, args.gemini_jitter, use_cache=args.cache)
+
+    report = {
+        'environment': environment(),
+        'config': {
+            'count': args.count,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'gemini_latency': args.gemini_latency,
+            'gemini_jitter': args.gemini_jitter,
+            'cache': args.cache,
+            'corpus_bytes': sum(len(item['data']) for item in corpus)
+        },
+        'results': recorder.results()
+    }
+
+    print(f"{'stage':<52} {'n':>5} {'per s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, summary in report['results'].items():
+        print(
+            f"{name:<52} {summary['count']:>5} {summary['throughput_per_s']:>9.1f} "
+            f"{summary['p50_ms']:>9.3f} {summary['p95_ms']:>9.3f} {summary['p99_ms']:>9.3f}"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        regressions = compare(report['results'], baseline, args.threshold, args.metric)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print('\nNo regressions')
+
+
+if __name__ == '__main__':
+    main()
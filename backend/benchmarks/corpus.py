@@ -0,0 +1,228 @@
+"""
+Synthetic Resume Corpus
+Deterministic PDF/DOCX resumes of varied length, page count and keyword density
+
+The same seed always produces byte-identical files, so benchmark runs on
+different commits parse exactly the same input. No third-party writer is
+needed: PDFs and DOCX files are assembled directly.
+
+Usage (from the backend folder):
+    python -m benchmarks.corpus --out /tmp/corpus [--count 24] [--seed 1]
+"""
+
+import argparse
+import io
+import os
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+
+FIRST_NAMES = ['Alex', 'Jordan', 'Sam', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Okafor', 'Novak', 'Silva', 'Khan', 'Larsen', 'Moreau', 'Ito']
+TITLES = ['Software Engineer', 'Data Analyst', 'Product Manager', 'DevOps Engineer', 'Backend Developer']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Stark Industries', 'Wayne Systems']
+
+# Filler vocabulary that matches no taxonomy keyword
+FILLER = (
+    'the team worked on several internal tools for customers and partners across many regions '
+    'with a focus on steady delivery clear ownership and careful review of every change made '
+    'during each quarter including planning estimates handover notes and weekly status updates'
+).split()
+
+# Built-in taxonomy keywords, inlined so the corpus does not change when the taxonomy does
+KEYWORDS = [
+    'python', 'java', 'javascript', 'react', 'django', 'flask', 'sql', 'postgresql', 'aws',
+    'docker', 'kubernetes', 'git', 'agile', 'scrum', 'machine learning', 'data analysis',
+    'rest api', 'microservices', 'ci/cd', 'terraform', 'leadership', 'communication',
+    'collaboration', 'problem solving', 'mentoring', 'developed', 'implemented', 'optimized',
+    'improved', 'reduced', 'led', 'designed', 'stakeholder', 'budget', 'roadmap'
+]
+
+SECTIONS = ['SUMMARY', 'EXPERIENCE', 'PROJECTS', 'EDUCATION', 'SKILLS', 'CERTIFICATIONS']
+
+# Lines that fit on one page of the generated PDFs (8pt with 14pt leading)
+LINES_PER_PAGE = 52
+
+# Corpus grid: every combination appears, in both formats
+PAGE_COUNTS = [1, 2, 3, 5]
+KEYWORD_DENSITIES = [0.02, 0.1, 0.25]
+
+
+def generate_lines(rng, pages, keyword_density):
+    """
+    Resume text lines filling roughly `pages` pages
+
+    Args:
+        rng: random.Random instance (the only source of randomness)
+        pages: Target page count
+        keyword_density: Fraction of body words replaced by taxonomy keywords
+
+    Returns:
+        list: Text lines, section headers included
+    """
+    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+    lines = [
+        name,
+        f'{name.lower().replace(" ", ".")}@example.com | 555-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+        rng.choice(TITLES)
+    ]
+    target = pages * LINES_PER_PAGE
+
+    def sentence(words):
+        body = [
+            rng.choice(KEYWORDS) if rng.random() < keyword_density else rng.choice(FILLER)
+            for _ in range(words)
+        ]
+        if rng.random() < 0.4:
+            body.append(f'by {rng.randint(5, 60)}%')
+        return ' '.join(body)
+
+    section_index = 0
+    while len(lines) < target:
+        section = SECTIONS[section_index % len(SECTIONS)]
+        section_index += 1
+        lines.append(section)
+        if section == 'EXPERIENCE':
+            for _ in range(rng.randint(2, 4)):
+                lines.append(f'{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({rng.randint(2010, 2020)} - {rng.randint(2021, 2024)})')
+                lines.extend(f'- {sentence(rng.randint(8, 14))}' for _ in range(rng.randint(3, 6)))
+        elif section == 'SKILLS':
+            lines.append(', '.join(rng.sample(KEYWORDS, rng.randint(5, 12))))
+        else:
+            lines.extend(sentence(rng.randint(8, 14)) for _ in range(rng.randint(2, 5)))
+
+    return lines[:target]
+
+
+def pdf_bytes(lines, lines_per_page=LINES_PER_PAGE):
+    """Minimal single-font PDF with one text line per row"""
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    kids = ' '.join(f'{4 + 2 * index} 0 R' for index in range(len(pages)))
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>',
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+    ]
+    for index, page_lines in enumerate(pages):
+        operations = ['BT', '/F1 8 Tf', '14 TL', '50 780 Td']
+        for line in page_lines:
+            line = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            operations.append(f'({line}) Tj T*')
+        operations.append('ET')
+        content = '\n'.join(operations)
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * index} 0 R >>'
+        )
+        objects.append(f'<< /Length {len(content.encode("latin-1"))} >>\nstream\n{content}\nendstream')
+
+    output = io.BytesIO()
+    output.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1'))
+
+    xref = output.tell()
+    output.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1'))
+    for offset in offsets:
+        output.write(f'{offset:010d} 00000 n \n'.encode('latin-1'))
+    output.write(
+        f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('latin-1')
+    )
+    return output.getvalue()
+
+
+def docx_bytes(lines):
+    """Minimal DOCX (content types, package relationship and one document part)"""
+    body = ''.join(f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in lines)
+    parts = {
+        '[Content_Types].xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ),
+        '_rels/.rels': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+            'relationships/officeDocument" Target="word/document.xml"/>'
+            '</Relationships>'
+        ),
+        'word/document.xml': (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        )
+    }
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts.items():
+            # Fixed timestamps keep the archive bytes identical across runs
+            info = zipfile.ZipInfo(name, date_time=(2024, 1, 1, 0, 0, 0))
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, content)
+    return output.getvalue()
+
+
+def build_corpus(count=24, seed=1):
+    """
+    Build the benchmark corpus
+
+    Cycles through every (format, page count, keyword density) combination,
+    so even small corpora cover each shape.
+
+    Args:
+        count: Number of resumes
+        seed: Random seed; the same seed always gives the same bytes
+
+    Returns:
+        list: Dicts with name, format, pages, keyword_density, text lines and data
+    """
+    rng = random.Random(seed)
+    shapes = [
+        (file_format, pages, density)
+        for pages in PAGE_COUNTS
+        for density in KEYWORD_DENSITIES
+        for file_format in ('pdf', 'docx')
+    ]
+
+    corpus = []
+    for index in range(count):
+        file_format, pages, density = shapes[index % len(shapes)]
+        lines = generate_lines(rng, pages, density)
+        corpus.append({
+            'name': f'resume_{index:03d}_{pages}p_{int(density * 100)}kw.{file_format}',
+            'format': file_format,
+            'pages': pages,
+            'keyword_density': density,
+            'lines': lines,
+            'data': pdf_bytes(lines) if file_format == 'pdf' else docx_bytes(lines)
+        })
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--out', required=True, help='Folder the resumes are written to')
+    parser.add_argument('--count', type=int, default=24, help='Number of resumes')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for item in build_corpus(args.count, args.seed):
+        with open(os.path.join(args.out, item['name']), 'wb') as handle:
+            handle.write(item['data'])
+    print(f"Wrote {args.count} resumes to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Load Generator
+Replays a mixed PDF/DOCX workload against a running server at rising concurrency
+
+Each level runs a fixed number of closed-loop clients (one request in
+flight per client, keep-alive connections) for a fixed duration, and
+reports sustained requests per second, errors and p50/p95/p99 latency.
+Only the Python standard library is used.
+
+Usage (from the backend folder), against e.g.
+    GEMINI_STUB_LATENCY=0.5 gunicorn -c gunicorn.conf.py benchmarks.stub_app:app
+run:
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000 --levels 1,4,16 --duration 20
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from benchmarks.bench_pipeline import environment, summarize
+from benchmarks.corpus import build_corpus
+
+
+def multipart_body(field, filename, data, fields=None):
+    """
+    Encode a multipart/form-data body with one file field
+
+    Returns:
+        tuple: (body bytes, content type header)
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode('utf-8')
+        )
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'.encode('utf-8')
+        + data + b'\r\n'
+    )
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+class LoadClient(threading.Thread):
+    """One closed-loop client: sends the next request as soon as the last one finishes"""
+
+    def __init__(self, url, path, requests, offset, stop_at, timeout):
+        """
+        Args:
+            url: Server base URL
+            path: Endpoint path
+            requests: Prepared (body, content type) pairs, replayed in a cycle
+            offset: Index this client starts at, so clients send different files
+            stop_at: time.monotonic() deadline for sending new requests
+            timeout: Socket timeout per request in seconds
+        """
+        super().__init__(daemon=True)
+        self.parts = urlsplit(url)
+        self.path = path
+        self.requests = requests
+        self.offset = offset
+        self.stop_at = stop_at
+        self.timeout = timeout
+        self.latencies = []
+        self.errors = {}
+
+    def run(self):
+        connection = None
+        index = self.offset
+        while time.monotonic() < self.stop_at:
+            body, content_type = self.requests[index % len(self.requests)]
+            index += 1
+            if connection is None:
+                connection_class = (
+                    http.client.HTTPSConnection if self.parts.scheme == 'https' else http.client.HTTPConnection
+                )
+                connection = connection_class(self.parts.hostname, self.parts.port, timeout=self.timeout)
+
+            start = time.perf_counter()
+            try:
+                connection.request('POST', self.path, body=body, headers={'Content-Type': content_type})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                self._error(type(e).__name__)
+                connection.close()
+                connection = None
+                continue
+
+            if status == 200:
+                self.latencies.append(time.perf_counter() - start)
+            else:
+                self._error(str(status))
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                connection = None
+
+        if connection is not None:
+            connection.close()
+
+    def _error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+def run_level(url, path, requests, concurrency, duration, timeout):
+    """
+    Run one concurrency level
+
+    Returns:
+        dict: concurrency, sustained req/s, error counts and latency summary
+    """
+    start = time.monotonic()
+    clients = [
+        LoadClient(url, path, requests, index * len(requests) // concurrency, start + duration, timeout)
+        for index in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.monotonic() - start
+
+    latencies = [latency for client in clients for latency in client.latencies]
+    errors = {}
+    for client in clients:
+        for kind, count in client.errors.items():
+            errors[kind] = errors.get(kind, 0) + count
+
+    summary = summarize(latencies)
+    # Sustained rate over the wall clock, not the per-request inverse latency
+    summary.pop('throughput_per_s')
+    return {
+        'concurrency': concurrency,
+        'requests_per_s': round(len(latencies) / elapsed, 2),
+        'completed': len(latencies),
+        'errors': errors,
+        'latency': summary
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Server base URL')
+    parser.add_argument('--path', default='/api/analyze-resume', help='Endpoint to load')
+    parser.add_argument('--levels', default='1,2,4,8,16', help='Comma-separated concurrency levels')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per level')
+    parser.add_argument('--pause', type=float, default=2, help='Seconds of idle between levels')
+    parser.add_argument('--count', type=int, default=24, help='Synthetic resumes in the replayed mix')
+    parser.add_argument('--seed', type=int, default=1, help='Corpus seed')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request socket timeout')
+    parser.add_argument('--job-description', help='Optional job description sent with every request')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    fields = {'job_description': args.job_description} if args.job_description else None
+    corpus = build_corpus(args.count, args.seed)
+    requests = [multipart_body('resume', item['name'], item['data'], fields) for item in corpus]
+    levels = [int(level) for level in args.levels.split(',')]
+
+    print(f"Loading {args.url}{args.path} with {len(corpus)} PDF/DOCX resumes, {args.duration:g}s per level")
+    print(f"{'clients':>7} {'req/s':>8} {'done':>6} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+
+    results = []
+    for position, concurrency in enumerate(levels):
+        if position:
+            time.sleep(args.pause)
+        level = run_level(args.url, args.path, requests, concurrency, args.duration, args.timeout)
+        results.append(level)
+        latency = level['latency']
+        print(
+            f"{concurrency:>7} {level['requests_per_s']:>8.1f} {level['completed']:>6} "
+            f"{sum(level['errors'].values()):>7} {latency['p50_ms']:>9.1f} {latency['p95_ms']:>9.1f} "
+            f"{latency['p99_ms']:>9.1f}"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'environment': environment(),
+                'config': {
+                    'url': args.url,
+                    'path': args.path,
+                    'duration': args.duration,
+                    'count': args.count,
+                    'seed': args.seed,
+                    'job_description': bool(args.job_description)
+                },
+                'levels': results
+            }, handle, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Stub App
+The production app with Gemini replaced by FakeGeminiModel, for load tests
+
+Serve it with the production gunicorn settings instead of app:app:
+    GEMINI_STUB_LATENCY=0.3 gunicorn -c gunicorn.conf.py benchmarks.stub_app:app
+
+GEMINI_STUB_LATENCY (mean seconds, default 0.3) and GEMINI_STUB_JITTER
+(default 0) shape the fake calls; the deadlines, retries, circuit breaker
+and batching around them are the production ones. Only this module reads
+these variables, so they have no effect on app:app.
+"""
+
+import os
+
+import app as application
+from services.fake_gemini import FakeGeminiModel
+from services.lazy import LazyService
+
+
+def install_fake_gemini(latency=0.3, jitter=0.0):
+    """
+    Swap the app's Gemini analyzer for one built around FakeGeminiModel
+
+    Routes and warmup() read the module global at call time, so every
+    later call (including the gunicorn master's warmup) uses the fake.
+    """
+    model = FakeGeminiModel(latency, jitter)
+    service = LazyService('gemini_analyzer', lambda: application.build_gemini_analyzer(model=model))
+    application.LAZY_SERVICES[application.LAZY_SERVICES.index(application.gemini_analyzer)] = service
+    application.gemini_analyzer = service
+    print(f"Warning: Gemini is replaced by a fake model with {latency}s latency")
+
+
+install_fake_gemini(
+    latency=float(os.getenv('GEMINI_STUB_LATENCY', 0.3)),
+    jitter=float(os.getenv('GEMINI_STUB_JITTER', 0))
+)
+
+app = application.app
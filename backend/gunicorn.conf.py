@@ -0,0 +1,112 @@
+"""
+Gunicorn Configuration
+Production server settings, sized by workload, with the app warmed before workers fork
+
+Usage (from the backend folder):
+    gunicorn -c gunicorn.conf.py app:app
+
+SERVER_PROFILE picks the concurrency model:
+    cpu    Mostly parsing and scoring (Gemini off or cached): one
+           single-threaded process per core, so CPU-bound work never
+           fights over the GIL
+    io     Mostly waiting on Gemini: a process per core with many threads
+           each, so slow model calls do not hold up whole processes
+    mixed  Default: one process more than there are cores, with a few
+           threads each, so Gemini waits overlap and parsing still has a
+           core per process
+WEB_CONCURRENCY, GUNICORN_THREADS and GUNICORN_WORKER_CLASS override the
+profile's choice.
+
+Every profile uses gthread workers. The batch NDJSON and SSE endpoints
+stream for as long as their Gemini calls take. A sync worker is killed
+once a request runs past the timeout, so a long stream would be cut off;
+gthread workers are only killed when the whole process stops responding.
+Each open stream still holds one thread, so stream-heavy traffic wants
+the io or mixed profile.
+"""
+
+import os
+import time
+
+from dotenv import load_dotenv
+
+# Same .env as app.py, read early so GEMINI_TIMEOUT etc. size the settings below
+load_dotenv()
+
+CPUS = os.cpu_count() or 1
+
+PROFILES = {
+    'cpu': {'worker_class': 'gthread', 'workers': CPUS, 'threads': 1},
+    'io': {'worker_class': 'gthread', 'workers': CPUS, 'threads': 16},
+    'mixed': {'worker_class': 'gthread', 'workers': CPUS + 1, 'threads': 4}
+}
+
+profile_name = os.getenv('SERVER_PROFILE', 'mixed').lower()
+if profile_name not in PROFILES:
+    raise ValueError(f"Unknown SERVER_PROFILE {profile_name!r}: expected one of {', '.join(PROFILES)}")
+profile = PROFILES[profile_name]
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', 5000)}")
+workers = int(os.getenv('WEB_CONCURRENCY') or profile['workers'])
+threads = int(os.getenv('GUNICORN_THREADS') or profile['threads'])
+worker_class = os.getenv('GUNICORN_WORKER_CLASS') or profile['worker_class']
+
+# The app sizes each worker's batch parsing pool from this, so the pools
+# together use about one process per core
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# Merge /metrics across the workers (set METRICS_SHARED=False to opt out)
+if not os.getenv('METRICS_SHARED'):
+    os.environ['METRICS_SHARED'] = 'True'
+
+# A request may parse a large PDF and then wait out the whole Gemini
+# deadline (GEMINI_TIMEOUT, retries included), so allow for both
+timeout = int(os.getenv('GUNICORN_TIMEOUT') or float(os.getenv('GEMINI_TIMEOUT', 15)) * 2 + 30)
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically so memory held by pdfminer and fragmented
+# heaps is returned; the jitter keeps workers from restarting together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers in containers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+# Import app.py in the master; workers inherit the loaded modules and the
+# warmed services below copy-on-write instead of each paying for them
+preload_app = True
+
+
+def when_ready(server):
+    """Warm the services after the app is loaded and before workers fork"""
+    server.log.info(
+        'Profile %s: %d %s worker(s) x %d thread(s), timeout %ds, recycle after %d requests',
+        profile_name, workers, worker_class, threads, timeout, max_requests
+    )
+
+    # Metrics merged across workers start from zero with each server start
+    from services.metrics import REGISTRY
+    REGISTRY.clear_shared()
+
+    if os.getenv('WARMUP', 'True').lower() != 'true':
+        return
+
+    from app import warmup
+
+    start = time.perf_counter()
+    warmup()
+    server.log.info('Services warmed in %.1f ms', (time.perf_counter() - start) * 1000)
+
+
+def worker_exit(server, worker):
+    """Write a recycled or stopping worker's last metric values"""
+    from services.metrics import REGISTRY
+    try:
+        REGISTRY.flush()
+    except Exception as e:
+        server.log.warning('Could not flush metrics: %s', e)
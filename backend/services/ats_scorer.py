@@ -4,7 +4,17 @@ Calculates ATS score based on keyword matching, section presence, and formatting
 """
 
 import re
+from bisect import bisect_right
 from collections import Counter
+from difflib import SequenceMatcher
+from itertools import accumulate
+
+import numpy as np
+from scipy import sparse
+
+from services.jd_matcher import JobDescriptionMatcher
+from services.metrics import stage
+from services.taxonomy import Taxonomy
 
 
 class ATSScorer:
@@ -52,197 +62,599 @@ class ATSScorer:
     CRITICAL_SECTIONS = ['experience', 'skills', 'education']
     RECOMMENDED_SECTIONS = ['summary', 'projects', 'certifications']
     
-    def __init__(self):
-        """Initialize ATS scorer with keyword database"""
-        # Flatten all keywords for easy matching
-        self.all_keywords = []
-        for category_keywords in self.ATS_KEYWORDS.values():
-            self.all_keywords.extend(category_keywords)
+    # Share of the total score per component (same order as the breakdown)
+    WEIGHTS = {
+        'keyword_match': 0.40,
+        'section_completeness': 0.30,
+        'formatting': 0.15,
+        'content_quality': 0.15
+    }
+    
+    # Quantified achievements ("40%", "10+")
+    METRIC_PATTERN = re.compile(r'\d+%|\d+\+')
+    EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+    PHONE_PATTERN = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+    
+    def __init__(self, taxonomy=None, jd_matcher=None):
+        """
+        Initialize ATS scorer with keyword database
+        
+        Args:
+            taxonomy: Optional default Taxonomy; the built-in ATS_KEYWORDS are
+                compiled into one when omitted
+            jd_matcher: Optional JobDescriptionMatcher (e.g. loaded with
+                corpus statistics) used when a job description is given
+        """
+        self.jd_matcher = jd_matcher or JobDescriptionMatcher()
+        # Compile every keyword into one matcher so the text is scanned once
+        self.taxonomy = taxonomy or Taxonomy('default', self.ATS_KEYWORDS, version='builtin')
+        self.all_keywords = self.taxonomy.all_keywords
+        self.keyword_matcher = self.taxonomy.matcher
     
-    def calculate_score(self, parsed_data):
+    def calculate_score(self, parsed_data, taxonomy=None, job_description=None, matches=None):
         """
         Calculate comprehensive ATS score
         
         Args:
             parsed_data: Dictionary with 'text', 'sections', 'word_count'
+                and optionally 'section_spans'
+            taxonomy: Optional Taxonomy to score against instead of the default
+            job_description: Optional job description text; adds a BM25
+                'job_match' and ranks missing skills by their weight in the JD
+            matches: Optional result of scan() or rescan() for this text and
+                taxonomy; the text is scanned when omitted
             
         Returns:
-            dict: Score, matched skills, missing skills, and breakdown
+            dict: Score, matched skills, missing skills, breakdown and an
+                'explanation' with match offsets (see _build_explanation)
         """
-        text = parsed_data['text'].lower()
+        text = self._lower(parsed_data['text'])
         sections = parsed_data['sections']
         word_count = parsed_data['word_count']
+        taxonomy = taxonomy or self.taxonomy
         
-        # Initialize scoring components
-        scores = {
-            'keyword_score': 0,
-            'section_score': 0,
-            'formatting_score': 0,
-            'content_quality_score': 0
-        }
+        # Find every keyword hit in a single pass; all components read from it
+        if matches is None:
+            with stage('score_match'):
+                matches = self.scan(text, taxonomy)
+        hits = matches['keywords']
         
         # 1. Keyword Matching Score (40% weight)
-        keyword_result = self._calculate_keyword_score(text)
-        scores['keyword_score'] = keyword_result['score']
+        with stage('score_keywords'):
+            keyword_result = self._calculate_keyword_score(hits, taxonomy)
         matched_skills = keyword_result['matched']
         
         # 2. Section Presence Score (30% weight)
-        scores['section_score'] = self._calculate_section_score(sections)
+        with stage('score_sections'):
+            section_result = self._calculate_section_score(sections)
         
         # 3. Formatting Score (15% weight)
-        scores['formatting_score'] = self._calculate_formatting_score(text, word_count)
+        with stage('score_formatting'):
+            formatting_result = self._calculate_formatting_score(matches, word_count)
         
         # 4. Content Quality Score (15% weight)
-        scores['content_quality_score'] = self._calculate_content_quality(text)
+        with stage('score_content_quality'):
+            content_result = self._calculate_content_quality(matches, taxonomy)
+        
+        components = {
+            'keyword_match': keyword_result,
+            'section_completeness': section_result,
+            'formatting': formatting_result,
+            'content_quality': content_result
+        }
         
         # Calculate weighted total score
-        total_score = (
-            scores['keyword_score'] * 0.40 +
-            scores['section_score'] * 0.30 +
-            scores['formatting_score'] * 0.15 +
-            scores['content_quality_score'] * 0.15
+        total_score = sum(
+            components[name]['score'] * weight for name, weight in self.WEIGHTS.items()
         )
         
         # Round to integer
         total_score = round(total_score)
         
         # Identify missing critical skills
-        missing_skills = self._identify_missing_skills(text)
+        job_match = None
+        if job_description:
+            with stage('score_job_match'):
+                job_match = self.jd_matcher.match(job_description, text)
+            missing_skills = job_match['missing_terms']
+        else:
+            missing_skills = self._identify_missing_skills(hits, taxonomy)
         
-        return {
+        result = {
             'score': total_score,
             'matched_skills': matched_skills[:15],  # Top 15 matched skills
             'missing_skills': missing_skills[:10],  # Top 10 missing skills
+            'taxonomy': {'name': taxonomy.name, 'version': taxonomy.version},
             'breakdown': {
-                'keyword_match': round(scores['keyword_score']),
-                'section_completeness': round(scores['section_score']),
-                'formatting': round(scores['formatting_score']),
-                'content_quality': round(scores['content_quality_score'])
-            }
+                name: round(component['score']) for name, component in components.items()
+            },
+            'explanation': self._build_explanation(
+                hits, taxonomy, components, parsed_data.get('section_spans') or []
+            )
+        }
+        
+        if job_match is not None:
+            result['job_match'] = job_match
+        
+        return result
+    
+    def scan(self, text, taxonomy=None):
+        """
+        Find everything the score components count, one pass per pattern
+        
+        Args:
+            text: Lower-cased resume text
+            taxonomy: Optional Taxonomy to match instead of the default
+            
+        Returns:
+            dict: 'keywords' (keyword -> [(start, end)]), 'metrics',
+                'emails' and 'phones' span lists and the 'bullets' count
+        """
+        taxonomy = taxonomy or self.taxonomy
+        return {
+            'keywords': taxonomy.matcher.find_all(text),
+            'metrics': [match.span() for match in self.METRIC_PATTERN.finditer(text)],
+            'emails': [match.span() for match in self.EMAIL_PATTERN.finditer(text)],
+            'phones': [match.span() for match in self.PHONE_PATTERN.finditer(text)],
+            'bullets': self._count_bullets(text)
+        }
+    
+    def rescore(self, parsed_data, previous=None, taxonomy=None, job_description=None):
+        """
+        Score an edited resume, reusing the matches of its previous version
+
+        Args:
+            parsed_data: Parsed new version of the resume
+            previous: The state returned by the last rescore() of this
+                resume, or None to scan the text in full
+            taxonomy: Optional Taxonomy to score against instead of the default
+            job_description: Optional job description text
+
+        Returns:
+            tuple: (result, state, changes) where result is the
+                calculate_score() result, state is JSON-serializable input
+                for the next rescore(), and changes is the rescan() diff
+                summary (None when the text was scanned in full, e.g. after
+                the taxonomy changed)
+        """
+        taxonomy = taxonomy or self.taxonomy
+        text = self._lower(parsed_data['text'])
+        version = [taxonomy.name, taxonomy.version]
+
+        changes = None
+        if previous is not None and previous['taxonomy'] == version:
+            with stage('score_rescan'):
+                matches, changes = self.rescan(previous['text'], previous['matches'], text, taxonomy)
+        else:
+            with stage('score_match'):
+                matches = self.scan(text, taxonomy)
+
+        result = self.calculate_score(parsed_data, taxonomy, job_description, matches=matches)
+        return result, {'text': text, 'matches': matches, 'taxonomy': version}, changes
+
+    def rescan(self, previous_text, previous_matches, text, taxonomy=None):
+        """
+        Update the matches of an earlier version of a resume after an edit
+        
+        No keyword or pattern match spans a line break, so the two versions
+        are diffed line by line: matches on unchanged lines are shifted to
+        their new offsets and only inserted or replaced lines are scanned.
+        The result equals scan(text, taxonomy).
+        
+        Args:
+            previous_text: Lower-cased text the previous matches came from
+            previous_matches: scan() or rescan() result for previous_text
+                (span tuples may be lists after a JSON round trip)
+            text: Lower-cased new text
+            taxonomy: The Taxonomy previous_matches were found with
+            
+        Returns:
+            tuple: (matches, changes) where changes has 'lines_added',
+                'lines_removed' and 'changed_fraction' (share of old and
+                new characters inside changed lines)
+        """
+        taxonomy = taxonomy or self.taxonomy
+        old_lines = previous_text.split('\n')
+        new_lines = text.split('\n')
+        old_starts = [0, *accumulate(len(line) + 1 for line in old_lines)]
+        new_starts = [0, *accumulate(len(line) + 1 for line in new_lines)]
+        
+        opcodes = SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+        
+        # Line opcodes as character ranges of the old and new text
+        blocks = [
+            (tag, old_starts[i1], old_starts[i2], new_starts[j1], new_starts[j2])
+            for tag, i1, i2, j1, j2 in opcodes
+        ]
+        changed = [block for block in blocks if block[0] != 'equal']
+        
+        def find_keywords(start, end):
+            return [
+                (hit_start + start, hit_end + start, keyword)
+                for keyword, spans in taxonomy.matcher.find_all(text[start:end]).items()
+                for hit_start, hit_end in spans
+            ]
+        
+        def finder(pattern):
+            return lambda start, end: [match.span() + (None,) for match in pattern.finditer(text, start, end)]
+        
+        old_keywords = sorted(
+            (start, end, keyword)
+            for keyword, spans in previous_matches['keywords'].items()
+            for start, end in spans
+        )
+        keywords = {}
+        for start, end, keyword in self._merge_spans(old_keywords, blocks, find_keywords):
+            keywords.setdefault(keyword, []).append((start, end))
+        
+        matches = {'keywords': keywords}
+        for name, pattern in (
+            ('metrics', self.METRIC_PATTERN),
+            ('emails', self.EMAIL_PATTERN),
+            ('phones', self.PHONE_PATTERN)
+        ):
+            old_spans = [(start, end, None) for start, end in previous_matches[name]]
+            matches[name] = [span[:2] for span in self._merge_spans(old_spans, blocks, finder(pattern))]
+        
+        matches['bullets'] = previous_matches['bullets'] + sum(
+            self._count_bullets(text, new_start, new_end) - self._count_bullets(previous_text, old_start, old_end)
+            for _, old_start, old_end, new_start, new_end in changed
+        )
+        
+        changed_chars = sum(old_end - old_start + new_end - new_start for _, old_start, old_end, new_start, new_end in changed)
+        changes = {
+            'lines_added': sum(j2 - j1 for tag, _, _, j1, j2 in opcodes if tag != 'equal'),
+            'lines_removed': sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag != 'equal'),
+            'changed_fraction': round(changed_chars / max(len(previous_text) + len(text), 1), 4)
         }
+        return matches, changes
+    
+    @staticmethod
+    def _merge_spans(old_spans, blocks, find):
+        """
+        Carry sorted (start, end, label) spans across diff blocks
+        
+        Spans in 'equal' blocks are shifted; spans in changed blocks are
+        dropped and find(start, end) supplies the new text's spans there.
+        The output stays sorted by start.
+        """
+        merged = []
+        position = 0
+        for tag, old_start, old_end, new_start, new_end in blocks:
+            if tag == 'equal':
+                shift = new_start - old_start
+                while position < len(old_spans) and old_spans[position][0] < old_end:
+                    start, end, label = old_spans[position]
+                    merged.append((start + shift, end + shift, label))
+                    position += 1
+            else:
+                while position < len(old_spans) and old_spans[position][0] < old_end:
+                    position += 1
+                if new_end > new_start:
+                    merged.extend(find(new_start, new_end))
+        return merged
+    
+    @staticmethod
+    def _count_bullets(text, start=0, end=None):
+        """Bullet-like characters in text[start:end]"""
+        end = len(text) if end is None else end
+        return text.count('•', start, end) + text.count('-', start, end) + text.count('*', start, end)
+    
+    def rank_resumes(self, resumes, taxonomy=None, job_description=None, top_k=50):
+        """
+        Score and rank many parsed resumes in one vectorized pass
+        
+        Each resume is scanned once by the keyword matcher to build a sparse
+        document-keyword matrix; all four score components are then computed
+        as array operations over every resume at once.
+        
+        Args:
+            resumes: List of dicts with 'id', 'text', 'sections', 'word_count'
+            taxonomy: Optional Taxonomy to score against instead of the default
+            job_description: Optional job description; when given, resumes are
+                ranked by their BM25 job match (ATS score breaks ties)
+            top_k: Number of results to return
+            
+        Returns:
+            list: Top-k results (best first) with scores and breakdowns
+        """
+        taxonomy = taxonomy or self.taxonomy
+        count = len(resumes)
+        if count == 0:
+            return []
+        
+        texts = [resume['text'].lower() for resume in resumes]
+        
+        # Document-keyword matrix (1 where a keyword occurs)
+        keyword_index = {keyword: column for column, keyword in enumerate(taxonomy.all_keywords)}
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for keyword in taxonomy.matcher.find_present(text):
+                rows.append(row)
+                cols.append(keyword_index[keyword])
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)),
+            shape=(count, len(keyword_index))
+        )
+        
+        # 1. Keyword Matching Score
+        matched_counts = np.asarray(matrix.sum(axis=1)).ravel()
+        keyword_scores = np.minimum(matched_counts / taxonomy.keyword_target * 100, 100)
+        
+        # 2. Section Presence Score
+        section_scores = self._vector_section_scores(resumes)
+        
+        # 3. Formatting Score
+        word_counts = np.array([resume['word_count'] for resume in resumes])
+        formatting_scores = self._vector_formatting_scores(texts, word_counts)
+        
+        # 4. Content Quality Score
+        verb_columns = [keyword_index[verb] for verb in taxonomy.keywords('action_verbs')]
+        verb_counts = np.asarray(matrix[:, verb_columns].sum(axis=1)).ravel()
+        metric_counts = np.array([len(self.METRIC_PATTERN.findall(text)) for text in texts])
+        content_scores = (
+            np.select([verb_counts >= 8, verb_counts >= 5, verb_counts >= 2], [60, 40, 20], 0) +
+            np.select([metric_counts >= 3, metric_counts >= 1], [40, 20], 0)
+        )
+        
+        totals = np.round(
+            keyword_scores * 0.40 +
+            section_scores * 0.30 +
+            formatting_scores * 0.15 +
+            content_scores * 0.15
+        )
+        
+        job_scores = None
+        if job_description:
+            job_scores = self.jd_matcher.score(job_description, texts)
+            order = np.lexsort((-totals, -job_scores))
+        else:
+            order = np.argsort(-totals, kind='stable')
+        
+        results = []
+        for rank, row in enumerate(order[:top_k], start=1):
+            result = {
+                'id': resumes[row].get('id', row),
+                'rank': rank,
+                'ats_score': int(totals[row]),
+                'score_breakdown': {
+                    'keyword_match': round(float(keyword_scores[row])),
+                    'section_completeness': round(float(section_scores[row])),
+                    'formatting': int(formatting_scores[row]),
+                    'content_quality': int(content_scores[row])
+                }
+            }
+            if job_scores is not None:
+                result['job_match'] = round(float(job_scores[row]))
+            results.append(result)
+        
+        return results
+    
+    def _vector_section_scores(self, resumes):
+        """Section completeness for many resumes (same weights as _calculate_section_score)"""
+        def present(names):
+            return np.array([
+                sum(1 for name in names if resume['sections'].get(name, False))
+                for resume in resumes
+            ])
+        
+        return (
+            present(self.CRITICAL_SECTIONS) / len(self.CRITICAL_SECTIONS) * 60 +
+            present(self.RECOMMENDED_SECTIONS) / len(self.RECOMMENDED_SECTIONS) * 40
+        )
     
-    def _calculate_keyword_score(self, text):
+    def _vector_formatting_scores(self, texts, word_counts):
+        """Formatting quality for many resumes (same rules as _calculate_formatting_score)"""
+        length_scores = np.select(
+            [
+                (word_counts >= 300) & (word_counts <= 800),
+                ((word_counts >= 200) & (word_counts < 300)) | ((word_counts > 800) & (word_counts <= 1000))
+            ],
+            [40, 25],
+            10
+        )
+        
+        bullet_counts = np.array([self._count_bullets(text) for text in texts])
+        bullet_scores = np.select([bullet_counts >= 5, bullet_counts >= 2], [30, 15], 0)
+        
+        email_scores = np.array([15 if self.EMAIL_PATTERN.search(text) else 0 for text in texts])
+        phone_scores = np.array([15 if self.PHONE_PATTERN.search(text) else 0 for text in texts])
+        
+        return length_scores + bullet_scores + email_scores + phone_scores
+    
+    def _calculate_keyword_score(self, hits, taxonomy):
         """
         Calculate score based on ATS keyword presence
         Returns score out of 100 and list of matched keywords
         """
-        matched_keywords = []
-        
-        for keyword in self.all_keywords:
-            # Use word boundaries for accurate matching
-            pattern = r'\b' + re.escape(keyword.lower()) + r'\b'
-            if re.search(pattern, text):
-                matched_keywords.append(keyword)
+        matched_keywords = [keyword for keyword in taxonomy.all_keywords if keyword in hits]
         
-        # Score based on percentage of keywords matched
+        # Score based on number of keywords matched
         # More keywords = better ATS compatibility
-        match_percentage = (len(matched_keywords) / len(self.all_keywords)) * 100
-        
         # Scale to 0-100 (cap at reasonable threshold)
-        # If 30% keywords matched = 100 score (excellent)
-        score = min((match_percentage / 30) * 100, 100)
+        # By default 30% of keywords matched = 100 score (excellent)
+        score = min((len(matched_keywords) / taxonomy.keyword_target) * 100, 100)
         
         return {
             'score': score,
-            'matched': matched_keywords
+            'matched': matched_keywords,
+            'target': taxonomy.keyword_target
         }
     
     def _calculate_section_score(self, sections):
         """Calculate score based on presence of important resume sections"""
-        score = 0
+        critical = [section for section in self.CRITICAL_SECTIONS if sections.get(section, False)]
+        recommended = [section for section in self.RECOMMENDED_SECTIONS if sections.get(section, False)]
         
         # Critical sections (60% of section score)
-        critical_present = sum(1 for section in self.CRITICAL_SECTIONS if sections.get(section, False))
-        critical_score = (critical_present / len(self.CRITICAL_SECTIONS)) * 60
+        critical_score = (len(critical) / len(self.CRITICAL_SECTIONS)) * 60
         
         # Recommended sections (40% of section score)
-        recommended_present = sum(1 for section in self.RECOMMENDED_SECTIONS if sections.get(section, False))
-        recommended_score = (recommended_present / len(self.RECOMMENDED_SECTIONS)) * 40
-        
-        score = critical_score + recommended_score
+        recommended_score = (len(recommended) / len(self.RECOMMENDED_SECTIONS)) * 40
         
-        return score
+        return {
+            'score': critical_score + recommended_score,
+            'critical_present': critical,
+            'critical_missing': [section for section in self.CRITICAL_SECTIONS if section not in critical],
+            'recommended_present': recommended,
+            'recommended_missing': [section for section in self.RECOMMENDED_SECTIONS if section not in recommended]
+        }
     
-    def _calculate_formatting_score(self, text, word_count):
+    def _calculate_formatting_score(self, matches, word_count):
         """
         Evaluate formatting quality indicators
         - Appropriate length (300-800 words ideal)
         - Consistent structure
         - No excessive special characters
         """
-        score = 0
-        
         # Length score (40% of formatting score)
         if 300 <= word_count <= 800:
-            length_score = 40
+            length_points = 40
         elif 200 <= word_count < 300 or 800 < word_count <= 1000:
-            length_score = 25
+            length_points = 25
         else:
-            length_score = 10
-        
-        score += length_score
+            length_points = 10
         
         # Bullet points usage (30% of formatting score)
-        bullet_count = len(re.findall(r'[•\-\*]', text))
+        bullet_count = matches['bullets']
         if bullet_count >= 5:
-            score += 30
+            bullet_points = 30
         elif bullet_count >= 2:
-            score += 15
-        
-        # Email presence (15% of formatting score)
-        if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text):
-            score += 15
+            bullet_points = 15
+        else:
+            bullet_points = 0
         
-        # Phone number presence (15% of formatting score)
-        if re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', text):
-            score += 15
+        # Email and phone presence (15% of formatting score each)
+        email = matches['emails'][0] if matches['emails'] else None
+        phone = matches['phones'][0] if matches['phones'] else None
         
-        return score
+        return {
+            'score': length_points + bullet_points + (15 if email else 0) + (15 if phone else 0),
+            'word_count': word_count,
+            'length_points': length_points,
+            'bullets': bullet_count,
+            'bullet_points': bullet_points,
+            'email': list(email) if email else None,
+            'phone': list(phone) if phone else None
+        }
     
-    def _calculate_content_quality(self, text):
+    def _calculate_content_quality(self, matches, taxonomy):
         """
         Assess content quality based on action verbs and quantifiable achievements
         """
-        score = 0
-        
         # Action verbs usage (60% of content score)
-        action_verb_count = 0
-        for verb in self.ATS_KEYWORDS['action_verbs']:
-            if re.search(r'\b' + re.escape(verb.lower()) + r'\b', text):
-                action_verb_count += 1
+        hits = matches['keywords']
+        action_verb_count = sum(1 for verb in taxonomy.keywords('action_verbs') if verb in hits)
         
         # Good: 8+ action verbs
         if action_verb_count >= 8:
-            score += 60
+            verb_points = 60
         elif action_verb_count >= 5:
-            score += 40
+            verb_points = 40
         elif action_verb_count >= 2:
-            score += 20
+            verb_points = 20
+        else:
+            verb_points = 0
         
         # Quantifiable metrics (40% of content score)
         # Look for numbers followed by % or numbers in context
-        metrics_count = len(re.findall(r'\d+%|\d+\+', text))
+        metric_spans = matches['metrics']
         
-        if metrics_count >= 3:
-            score += 40
-        elif metrics_count >= 1:
-            score += 20
+        if len(metric_spans) >= 3:
+            metric_points = 40
+        elif metric_spans:
+            metric_points = 20
+        else:
+            metric_points = 0
         
-        return score
+        return {
+            'score': verb_points + metric_points,
+            'action_verbs': action_verb_count,
+            'action_verb_points': verb_points,
+            'metrics': len(metric_spans),
+            'metric_points': metric_points,
+            'metric_spans': metric_spans
+        }
+    
+    def _build_explanation(self, hits, taxonomy, components, section_spans):
+        """
+        Explain a score from the data its components already computed
+        
+        Offsets index the cleaned resume text (parsed_data['text']). Every
+        match is encoded as a flat integer triple (start, end, section),
+        where section indexes 'sections' (the parser's section_spans, in
+        document order) and -1 means text before the first header.
+        
+        Returns:
+            dict: sections, keywords and action_verbs rows of
+                [keyword, category, count, [start, end, section, ...]],
+                metrics triples and per-component contributions
+        """
+        starts = [span['start'] for span in section_spans]
+        
+        def locate(start, end):
+            index = bisect_right(starts, start) - 1
+            if index >= 0 and start >= section_spans[index]['end']:
+                index = -1
+            return [start, end, index]
+        
+        keywords, action_verbs = [], []
+        for keyword in taxonomy.all_keywords:
+            offsets = hits.get(keyword)
+            if not offsets:
+                continue
+            categories = taxonomy.matcher.categories[keyword]
+            row = [
+                keyword,
+                categories[0],
+                len(offsets),
+                [value for start, end in offsets for value in locate(start, end)]
+            ]
+            (action_verbs if 'action_verbs' in categories else keywords).append(row)
+        
+        details = {}
+        for name, component in components.items():
+            detail = {key: value for key, value in component.items() if key not in ('matched', 'metric_spans')}
+            detail['weight'] = self.WEIGHTS[name]
+            detail['points'] = round(component['score'] * self.WEIGHTS[name], 2)
+            detail['score'] = round(component['score'], 2)
+            details[name] = detail
+        details['keyword_match']['matched'] = len(components['keyword_match']['matched'])
+        
+        return {
+            'sections': [span['section'] for span in section_spans],
+            'keywords': keywords,
+            'action_verbs': action_verbs,
+            'metrics': [
+                value for start, end in components['content_quality']['metric_spans']
+                for value in locate(start, end)
+            ],
+            'components': details
+        }
+    
+    @staticmethod
+    def _lower(text):
+        """
+        Lower-case text without changing its length, so match offsets
+        line up with the original (e.g. 'İ' lowers to two characters)
+        """
+        lowered = text.lower()
+        if len(lowered) == len(text):
+            return lowered
+        return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
     
-    def _identify_missing_skills(self, text):
+    def _identify_missing_skills(self, hits, taxonomy):
         """Identify high-value skills that are missing from resume"""
         missing = []
         
         # Focus on most common/valuable technical and soft skills
         priority_skills = (
-            self.ATS_KEYWORDS['technical'][:20] +
-            self.ATS_KEYWORDS['soft_skills'][:10]
+            taxonomy.keywords('technical')[:20] +
+            taxonomy.keywords('soft_skills')[:10]
         )
         
         for skill in priority_skills:
-            pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            if not re.search(pattern, text):
+            if skill not in hits:
                 missing.append(skill)
         
         return missing
@@ -0,0 +1,149 @@
+"""
+Batch Analyzer Service
+Fans resume parsing out to a process pool and yields results as they finish
+"""
+
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from services.resume_parser import ResumeParser, pool_context
+
+# One parser per pool process, created by the pool initializer or on first use
+_worker_parser = None
+
+
+def init_worker_parser(parser_options):
+    """Pool initializer: build this process's parser with the app's settings"""
+    global _worker_parser
+    _worker_parser = ResumeParser(**parser_options)
+
+
+def parse_resume_bytes(filename, data):
+    """
+    Parse one uploaded resume held in memory inside a pool process
+
+    Args:
+        filename: Original (sanitized) file name
+        data: Raw file bytes; the type is detected from the content
+
+    Returns:
+        dict: Parsed data from ResumeParser.parse
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = ResumeParser()
+
+    return _worker_parser.parse(data)
+
+
+class BatchAnalyzer:
+    """Parse many resumes in parallel across a process pool"""
+
+    def __init__(self, max_workers=None, max_files=500, max_file_size=5242880, cache=None,
+                 parser_options=None):
+        """
+        Initialize the batch analyzer
+
+        Args:
+            max_workers: Pool size (defaults to the CPU count)
+            max_files: Maximum number of resumes accepted per batch
+            max_file_size: Maximum size in bytes of a single resume
+            cache: Optional ResultCache; files already parsed are not re-parsed
+            parser_options: Keyword arguments for the ResumeParser in each
+                pool process (page workers are forced to 1 there, since the
+                pool already runs one file per CPU)
+        """
+        self.cache = cache
+        self.parser_options = dict(parser_options or {}, pdf_workers=1)
+        self.parser_fingerprint = ResumeParser(**self.parser_options).fingerprint()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_files = max_files
+        self.max_file_size = max_file_size
+        self._executor = None
+
+    def read_archive(self, stream, is_allowed):
+        """
+        Extract resume files from a zip archive
+
+        Args:
+            stream: File-like object holding the zip archive
+            is_allowed: Callable deciding whether a file name is accepted
+
+        Returns:
+            list: (filename, bytes or None, error or None) tuples
+        """
+        uploads = []
+        try:
+            with zipfile.ZipFile(stream) as archive:
+                for info in archive.infolist():
+                    name = os.path.basename(info.filename)
+                    if info.is_dir() or not name or info.filename.startswith('__MACOSX/'):
+                        continue
+
+                    if len(uploads) >= self.max_files:
+                        break
+
+                    if not is_allowed(name):
+                        uploads.append((name, None, 'Invalid file type'))
+                    elif info.file_size > self.max_file_size:
+                        uploads.append((name, None, 'File size exceeds maximum limit'))
+                    else:
+                        with archive.open(info) as member:
+                            uploads.append((name, member.read(self.max_file_size + 1), None))
+        except zipfile.BadZipFile:
+            raise ValueError('Archive is not a valid zip file')
+
+        return uploads
+
+    def parse_all(self, uploads):
+        """
+        Parse uploads in parallel, yielding each one as soon as it is done
+
+        Args:
+            uploads: List of (filename, bytes or None, error or None) tuples
+
+        Yields:
+            tuple: (filename, parsed data or None, error message or None)
+        """
+        futures = {}
+        for filename, data, error in uploads[:self.max_files]:
+            if error:
+                yield filename, None, error
+            elif len(data) > self.max_file_size:
+                yield filename, None, 'File size exceeds maximum limit'
+            else:
+                parse_key = self._parse_key(data) if self.cache is not None else None
+                parsed_data = self.cache.get('parsed', parse_key) if parse_key else None
+                if parsed_data is not None:
+                    yield filename, parsed_data, None
+                else:
+                    future = self._get_executor().submit(parse_resume_bytes, filename, data)
+                    futures[future] = (filename, parse_key)
+
+        for future in as_completed(futures):
+            filename, parse_key = futures[future]
+            try:
+                parsed_data = future.result()
+            except Exception as e:
+                yield filename, None, str(e)
+                continue
+
+            if parse_key:
+                self.cache.set('parsed', parse_key, parsed_data)
+            yield filename, parsed_data, None
+
+    def _parse_key(self, data):
+        """Cache key of a file's parse: content hash plus parser version and options"""
+        return self.cache.make_key(self.cache.hash_bytes(data), self.parser_fingerprint)
+
+    def _get_executor(self):
+        """Create the process pool on first use (after any worker fork)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=init_worker_parser,
+                initargs=(self.parser_options,),
+                mp_context=pool_context()
+            )
+        return self._executor
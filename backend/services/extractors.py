@@ -0,0 +1,498 @@
+"""
+Extractors Service
+Registry of document text extractors, selected by the file's magic bytes
+"""
+
+import re
+import zipfile
+
+
+class Extractor:
+    """Base class for a document format"""
+
+    # Short type name reported as parsed_data['file_type']
+    name = None
+    mime_types = ()
+    extensions = ()
+
+    # True: extract() gets the seekable binary stream (large files are not
+    # loaded into memory); False: extract() gets the raw bytes
+    streaming = False
+
+    def matches(self, head, stream):
+        """
+        Check whether a document is in this format
+
+        Args:
+            head: First bytes of the document
+            stream: Seekable binary stream, for formats that need a deeper look
+                (the registry restores its position)
+        """
+        raise NotImplementedError
+
+    def extract(self, source, parser):
+        """
+        Extract plain text
+
+        Args:
+            source: Stream or bytes, depending on `streaming`
+            parser: ResumeParser, for format options such as page budgets
+
+        Returns:
+            tuple: (text, extraction stats dict)
+        """
+        raise NotImplementedError
+
+
+class ExtractorRegistry:
+    """Ordered set of extractors; the first one whose magic matches wins"""
+
+    HEAD_SIZE = 2048
+
+    def __init__(self):
+        self._extractors = []
+
+    def register(self, extractor):
+        """Add an extractor (checked after those registered earlier)"""
+        self._extractors.append(extractor)
+        return extractor
+
+    def detect(self, stream):
+        """
+        Find the extractor for a document from its content
+
+        Args:
+            stream: Seekable binary stream (position is restored)
+
+        Returns:
+            Extractor or None if no format matches
+        """
+        position = stream.tell()
+        try:
+            head = stream.read(self.HEAD_SIZE)
+            for extractor in self._extractors:
+                stream.seek(position)
+                if extractor.matches(head, stream):
+                    return extractor
+            return None
+        finally:
+            stream.seek(position)
+
+    def get(self, name):
+        """Extractor registered under a type name, or None"""
+        return next((extractor for extractor in self._extractors if extractor.name == name), None)
+
+    def names(self):
+        """Type names in detection order"""
+        return [extractor.name for extractor in self._extractors]
+
+    def extensions(self):
+        """All file extensions the registered formats use"""
+        return sorted({extension for extractor in self._extractors for extension in extractor.extensions})
+
+
+class PdfExtractor(Extractor):
+    """PDF via pdfplumber, with the parser's page budgets and page workers"""
+
+    name = 'pdf'
+    mime_types = ('application/pdf',)
+    extensions = ('pdf',)
+    streaming = True
+
+    def matches(self, head, stream):
+        # The PDF header may be preceded by junk within the first 1KB
+        return b'%PDF-' in head[:1024]
+
+    def extract(self, source, parser):
+        return parser._parse_pdf(source)
+
+
+def _zip_has(stream, member, content=None):
+    """Whether a stream is a zip archive holding `member` (optionally with exact content)"""
+    try:
+        with zipfile.ZipFile(stream) as archive:
+            if member not in archive.namelist():
+                return False
+            return content is None or archive.read(member).strip() == content
+    except zipfile.BadZipFile:
+        return False
+
+
+class DocxExtractor(Extractor):
+    """Word documents, streamed part by part out of the zip"""
+
+    name = 'docx'
+    mime_types = ('application/vnd.openxmlformats-officedocument.wordprocessingml.document',)
+    extensions = ('docx',)
+    streaming = True
+
+    W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+    # Parts holding visible text, read in this order around word/document.xml
+    HEADER_PART = re.compile(r'word/header\d*\.xml$')
+    FOOTER_PART = re.compile(r'word/footer\d*\.xml$')
+
+    def matches(self, head, stream):
+        return head.startswith(b'PK\x03\x04') and _zip_has(stream, 'word/document.xml')
+
+    def extract(self, source, parser):
+        """
+        Read headers, the document body (paragraphs, tables, text boxes)
+        and footers with iterparse, so memory is bounded by the largest
+        part rather than a full object model. Header/footer parts repeated
+        for different page types are read once.
+        """
+        try:
+            with zipfile.ZipFile(source) as archive:
+                names = archive.namelist()
+                parts = (
+                    sorted(name for name in names if self.HEADER_PART.match(name))
+                    + ['word/document.xml']
+                    + sorted(name for name in names if self.FOOTER_PART.match(name))
+                )
+
+                blocks = []
+                for name in parts:
+                    with archive.open(name) as part:
+                        block = self._part_text(part)
+                    if block.strip() and block not in blocks:
+                        blocks.append(block)
+        except Exception as e:
+            raise Exception(f"Error parsing DOCX: {str(e)}")
+
+        return '\n'.join(blocks), {}
+
+    def _part_text(self, part):
+        """
+        Collect the text runs of one WordprocessingML part
+
+        Paragraphs end with a line break; table cells are separated by tabs
+        so each row stays on one line. Text boxes appear twice in modern
+        files (DrawingML and a VML fallback), so mc:Fallback is skipped.
+        """
+        from xml.etree import ElementTree
+
+        W = self.W
+        pieces = []
+        skip_depth = 0
+        cell_depth = 0
+
+        for event, element in ElementTree.iterparse(part, events=('start', 'end')):
+            tag = element.tag
+
+            if event == 'start':
+                if tag == self.MC_FALLBACK or skip_depth:
+                    skip_depth += 1
+                elif tag == W + 'tc':
+                    cell_depth += 1
+                elif tag == W + 'txbxContent':
+                    # Text box content starts on its own line
+                    pieces.append('\n')
+                continue
+
+            if skip_depth:
+                skip_depth -= 1
+            elif tag == W + 't':
+                if element.text:
+                    pieces.append(element.text)
+            elif tag == W + 'tab':
+                pieces.append('\t')
+            elif tag in (W + 'br', W + 'cr', W + 'p'):
+                pieces.append(' ' if cell_depth else '\n')
+            elif tag == W + 'tc':
+                cell_depth -= 1
+                pieces.append('\t')
+            elif tag == W + 'tr':
+                pieces.append('\n')
+
+            # Drop parsed content as we go (the root keeps only empty stubs)
+            element.clear()
+
+        return ''.join(pieces)
+
+
+class OdtExtractor(Extractor):
+    """OpenDocument text (LibreOffice, Google Docs export)"""
+
+    name = 'odt'
+    mime_types = ('application/vnd.oasis.opendocument.text',)
+    extensions = ('odt',)
+    streaming = True
+
+    TEXT = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+    TABLE = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+
+    def matches(self, head, stream):
+        return head.startswith(b'PK\x03\x04') and _zip_has(stream, 'mimetype', self.mime_types[0].encode())
+
+    def extract(self, source, parser):
+        """Stream content.xml, emitting each top-level paragraph as it closes"""
+        from xml.etree import ElementTree
+
+        TEXT, TABLE = self.TEXT, self.TABLE
+        paragraph_tags = (TEXT + 'p', TEXT + 'h')
+        pieces = []
+        paragraph_depth = 0
+        cell_depth = 0
+
+        try:
+            with zipfile.ZipFile(source) as archive, archive.open('content.xml') as part:
+                for event, element in ElementTree.iterparse(part, events=('start', 'end')):
+                    tag = element.tag
+                    if event == 'start':
+                        if tag in paragraph_tags:
+                            paragraph_depth += 1
+                        elif tag == TABLE + 'table-cell':
+                            cell_depth += 1
+                        continue
+
+                    if tag in paragraph_tags:
+                        paragraph_depth -= 1
+                        if paragraph_depth == 0:
+                            # Mixed content (text, spans, tails) is only complete at the end
+                            pieces.append(self._paragraph_text(element))
+                            pieces.append(' ' if cell_depth else '\n')
+                            element.clear()
+                    elif tag == TABLE + 'table-cell':
+                        cell_depth -= 1
+                        pieces.append('\t')
+                    elif tag == TABLE + 'table-row':
+                        pieces.append('\n')
+                        element.clear()
+        except Exception as e:
+            raise Exception(f"Error parsing ODT: {str(e)}")
+
+        return ''.join(pieces), {}
+
+    def _paragraph_text(self, element):
+        """Text of a paragraph, spans and nested frames included, in document order"""
+        TEXT = self.TEXT
+        pieces = [element.text or '']
+        for child in element:
+            if child.tag == TEXT + 's':
+                pieces.append(' ' * int(child.get(TEXT + 'c', 1)))
+            elif child.tag == TEXT + 'tab':
+                pieces.append('\t')
+            elif child.tag == TEXT + 'line-break':
+                pieces.append('\n')
+            else:
+                pieces.append(self._paragraph_text(child))
+                if child.tag in (TEXT + 'p', TEXT + 'h'):
+                    pieces.append('\n')
+            pieces.append(child.tail or '')
+        return ''.join(pieces)
+
+
+def _decode_text(data):
+    """Decode text bytes: BOM first, then UTF-8, then Windows-1252"""
+    if data.startswith(b'\xef\xbb\xbf'):
+        return data[3:].decode('utf-8', errors='replace')
+    if data.startswith((b'\xff\xfe', b'\xfe\xff')):
+        return data.decode('utf-16', errors='replace')
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('cp1252', errors='replace')
+
+
+class RtfExtractor(Extractor):
+    """Rich Text Format, converted with a small built-in reader"""
+
+    name = 'rtf'
+    mime_types = ('application/rtf', 'text/rtf')
+    extensions = ('rtf',)
+
+    TOKEN = re.compile(
+        r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|([^\\{}\r\n]+)",
+        re.IGNORECASE
+    )
+
+    # Groups whose content is not document text
+    DESTINATIONS = frozenset('''
+        fonttbl colortbl stylesheet listtable listoverridetable revtbl rsidtbl info pict
+        object datastore themedata colorschememapping latentstyles generator xmlnstbl
+        fldinst pgdsctbl filetbl mmathPr
+    '''.split())
+
+    SPECIAL = {
+        'par': '\n', 'line': '\n', 'sect': '\n', 'page': '\n', 'row': '\n',
+        'tab': '\t', 'cell': '\t',
+        'emdash': '\u2014', 'endash': '\u2013', 'bullet': '\u2022',
+        'lquote': '\u2018', 'rquote': '\u2019', 'ldblquote': '\u201c', 'rdblquote': '\u201d'
+    }
+
+    def matches(self, head, stream):
+        return head.lstrip().startswith(b'{\\rtf')
+
+    def extract(self, source, parser):
+        try:
+            return self.to_text(source.decode('latin-1')), {}
+        except Exception as e:
+            raise Exception(f"Error parsing RTF: {str(e)}")
+
+    def to_text(self, rtf):
+        """
+        Convert RTF markup to plain text
+
+        Tracks group nesting to skip non-text destinations ({\\fonttbl ...},
+        {\\* ...}) and the ANSI fallback characters that follow \\u escapes.
+        """
+        stack = []
+        ignorable = False
+        skip_fallback = 1
+        pending_skip = 0
+        pieces = []
+        raw_bytes = bytearray()
+
+        def flush_bytes():
+            if raw_bytes:
+                pieces.append(raw_bytes.decode('cp1252', errors='replace'))
+                raw_bytes.clear()
+
+        for match in self.TOKEN.finditer(rtf):
+            word, argument, hex_code, symbol, brace, text = match.groups()
+
+            if brace:
+                flush_bytes()
+                pending_skip = 0
+                if brace == '{':
+                    stack.append((ignorable, skip_fallback))
+                elif stack:
+                    ignorable, skip_fallback = stack.pop()
+            elif pending_skip and (hex_code or text):
+                # Skip the fallback characters of a preceding \uN
+                if hex_code:
+                    pending_skip -= 1
+                else:
+                    skipped = min(pending_skip, len(text))
+                    pending_skip -= skipped
+                    if not ignorable and text[skipped:]:
+                        flush_bytes()
+                        pieces.append(text[skipped:])
+            elif symbol:
+                if symbol == '*':
+                    ignorable = True
+                elif not ignorable and symbol in '\\{}':
+                    flush_bytes()
+                    pieces.append(symbol)
+                elif not ignorable and symbol == '~':
+                    flush_bytes()
+                    pieces.append(' ')
+            elif word:
+                if word in self.DESTINATIONS:
+                    ignorable = True
+                elif word == 'uc':
+                    skip_fallback = int(argument or 1)
+                elif ignorable:
+                    continue
+                elif word == 'u':
+                    flush_bytes()
+                    code = int(argument)
+                    pieces.append(chr(code + 65536 if code < 0 else code))
+                    pending_skip = skip_fallback
+                elif word in self.SPECIAL:
+                    flush_bytes()
+                    pieces.append(self.SPECIAL[word])
+            elif hex_code:
+                if not ignorable:
+                    raw_bytes.append(int(hex_code, 16))
+            elif text and not ignorable:
+                flush_bytes()
+                pieces.append(text)
+
+        flush_bytes()
+        return ''.join(pieces)
+
+
+class HtmlExtractor(Extractor):
+    """HTML resumes (e.g. exported from online builders)"""
+
+    name = 'html'
+    mime_types = ('text/html',)
+    extensions = ('html', 'htm')
+
+    MARKER = re.compile(rb'<!doctype\s+html|<html[\s>]|<body[\s>]', re.IGNORECASE)
+
+    def matches(self, head, stream):
+        return self.MARKER.search(head) is not None
+
+    def extract(self, source, parser):
+        from html.parser import HTMLParser
+
+        skip_tags = {'script', 'style', 'noscript', 'template', 'head'}
+        line_tags = {
+            'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+            'section', 'article', 'header', 'footer', 'ul', 'ol', 'table', 'dt', 'dd'
+        }
+
+        class TextCollector(HTMLParser):
+            def __init__(self):
+                super().__init__(convert_charrefs=True)
+                self.pieces = []
+                self.skip_depth = 0
+
+            def handle_starttag(self, tag, attrs):
+                if tag in skip_tags:
+                    self.skip_depth += 1
+                elif tag in line_tags:
+                    self.pieces.append('\n')
+                elif tag in ('td', 'th'):
+                    self.pieces.append('\t')
+
+            def handle_endtag(self, tag):
+                if tag in skip_tags:
+                    self.skip_depth = max(0, self.skip_depth - 1)
+                elif tag in line_tags:
+                    self.pieces.append('\n')
+
+            def handle_data(self, data):
+                if not self.skip_depth:
+                    self.pieces.append(data)
+
+        collector = TextCollector()
+        try:
+            collector.feed(_decode_text(source))
+            collector.close()
+        except Exception as e:
+            raise Exception(f"Error parsing HTML: {str(e)}")
+
+        return ''.join(collector.pieces), {}
+
+
+class TextExtractor(Extractor):
+    """Plain text and Markdown; the fallback for anything that decodes as text"""
+
+    name = 'text'
+    mime_types = ('text/plain', 'text/markdown')
+    extensions = ('txt', 'md', 'markdown')
+
+    # Magic numbers of common binary formats that must never be read as text
+    BINARY_MAGIC = (b'PK\x03\x04', b'%PDF', b'\xd0\xcf\x11\xe0', b'\x89PNG', b'GIF8', b'\xff\xd8\xff')
+
+    # Markdown syntax removed from the text: headings, emphasis, code, links
+    MARKDOWN = re.compile(r'^#{1,6}[ \t]+|^>[ \t]?|\*\*|__|`+|!?\[([^\]]*)\]\([^)]*\)', re.MULTILINE)
+
+    def matches(self, head, stream):
+        if head.startswith(self.BINARY_MAGIC):
+            return False
+        if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+            return True
+        if b'\x00' in head:
+            return False
+        text = _decode_text(head)
+        printable = sum(1 for char in text if char.isprintable() or char in '\r\n\t\f')
+        return printable >= 0.95 * max(len(text), 1)
+
+    def extract(self, source, parser):
+        text = _decode_text(source)
+        return self.MARKDOWN.sub(lambda match: match.group(1) or '', text), {}
+
+
+def default_registry():
+    """Registry with every built-in format, binary formats checked first"""
+    registry = ExtractorRegistry()
+    for extractor in (PdfExtractor(), DocxExtractor(), OdtExtractor(), RtfExtractor(),
+                      HtmlExtractor(), TextExtractor()):
+        registry.register(extractor)
+    return registry
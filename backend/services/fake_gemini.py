@@ -0,0 +1,60 @@
+"""
+Fake Gemini Service
+Stand-in for the Gemini model that sleeps instead of calling the API, for benchmarks and load tests
+"""
+
+import json
+import random
+import re
+import time
+
+
+SUGGESTIONS = [
+    'Quantify the impact of your most recent role with concrete metrics.',
+    'Move the skills section above education so keywords are found early.',
+    'Start every experience bullet with a strong action verb.',
+    'Add a two-line summary tailored to the target role.',
+    'List the cloud and container tools you used in each project.'
+]
+
+
+class FakeResponse:
+    """Mimics the .text of a Gemini response or stream chunk"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """generate_content stand-in that sleeps like a remote model would"""
+
+    BATCH_ID = re.compile(r'### Resume id: (\S+)')
+
+    def __init__(self, latency=0.3, jitter=0.1, seed=1):
+        """
+        Args:
+            latency: Mean seconds per call
+            jitter: Uniform +/- seconds around the mean
+            seed: Seed for the jitter, so runs are repeatable
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        ids = self.BATCH_ID.findall(prompt)
+        text = json.dumps({resume_id: SUGGESTIONS for resume_id in ids} if ids else SUGGESTIONS)
+
+        if not stream:
+            time.sleep(delay)
+            return FakeResponse(text)
+        return self._stream(text, delay)
+
+    def _stream(self, text, delay, chunks=5):
+        """Spread the answer over several chunks; the first arrives after half the delay"""
+        size = len(text) // chunks + 1
+        time.sleep(delay / 2)
+        for start in range(0, len(text), size):
+            yield FakeResponse(text[start:start + size])
+            time.sleep(delay / 2 / chunks)
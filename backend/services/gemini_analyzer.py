@@ -3,29 +3,150 @@ Gemini AI Analyzer Service
 Uses Google Gemini API to provide intelligent resume analysis and suggestions
 """
 
-import google.generativeai as genai
 import json
+import threading
+
+from services.llm_client import CircuitBreaker, ResilientLLMClient
+from services.llm_scheduler import RateLimitedError
+from services.metrics import REGISTRY, stage
+from services.prompt_builder import PromptBuilder
+
+
+FALLBACKS = REGISTRY.counter(
+    'interats_fallback_suggestions_total',
+    'Analyses answered with rule-based suggestions instead of Gemini',
+    ['reason']
+)
+
+
+class SuggestionStreamParser:
+    """Pulls suggestion strings out of a JSON array as its text streams in"""
+    
+    def __init__(self):
+        self.text = ''
+        self._position = 0
+        self._depth = 0
+        self._string_start = None
+        self._escaped = False
+    
+    def feed(self, chunk):
+        """
+        Consume the next piece of model output
+        
+        Args:
+            chunk: Newly received text
+            
+        Returns:
+            list: Suggestions whose closing quote arrived in this chunk
+        """
+        self.text += chunk
+        found = []
+        text = self.text
+        
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._string_start is not None:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    literal = text[self._string_start:index + 1]
+                    self._string_start = None
+                    if self._depth >= 1:
+                        try:
+                            suggestion = json.loads(literal).strip()
+                        except ValueError:
+                            continue
+                        if suggestion:
+                            found.append(suggestion)
+            elif char == '"':
+                self._string_start = index
+            elif char == '[':
+                self._depth += 1
+            elif char == ']':
+                self._depth -= 1
+        
+        self._position = len(text)
+        return found
 
 
 class GeminiAnalyzer:
     """AI-powered resume analyzer using Google Gemini"""
     
-    def __init__(self, api_key):
+    MODEL_NAME = 'gemini-1.5-flash'
+    
+    # Rough output allowance per resume, alone or in a batch (5 short suggestions)
+    OUTPUT_TOKENS = 300
+    BATCH_OUTPUT_TOKENS = OUTPUT_TOKENS
+    
+    def __init__(self, api_key, cache=None, model=None, timeout=15.0, max_concurrency=8,
+                 max_retries=2, breaker=None, batch_size=8, batch_max_tokens=12000,
+                 prompt_tokens=800, scheduler=None):
         """
         Initialize Gemini AI with API key
         
         Args:
             api_key: Google Gemini API key
+            cache: Optional ResultCache; AI suggestions are cached per
+                (prompt hash, model) so repeat analyses skip the API call
+            model: Optional object with generate_content (e.g. a local fake
+                for tests); used instead of the Gemini model when given
+            timeout: Per-call deadline in seconds, retries included
+            max_concurrency: Maximum Gemini calls in flight per process
+            max_retries: Retries on rate limits and transient server errors
+            breaker: Optional CircuitBreaker that sends requests straight to
+                the fallback suggestions while Gemini is failing
+            batch_size: Maximum resumes packed into one analyze_batch request
+            batch_max_tokens: Estimated prompt token budget per batch request
+            prompt_tokens: Estimated token budget for the resume excerpt in
+                each prompt (highest-value sections first)
+            scheduler: Optional LLMScheduler enforcing the API's request and
+                token limits across worker processes; calls that would wait
+                too long get the fallback suggestions
         """
-        if not api_key or api_key == 'your_gemini_api_key_here':
+        self.cache = cache
+        self.batch_size = batch_size
+        self.batch_max_tokens = batch_max_tokens
+        self.prompt_builder = PromptBuilder(max_tokens=prompt_tokens)
+        self._fallbacks = 0
+        self._prompt_tokens = 0
+        self._lock = threading.Lock()
+        
+        if model is not None:
+            self.enabled = True
+            self.model = model
+        elif not api_key or api_key == 'your_gemini_api_key_here':
             self.enabled = False
             print("Warning: Gemini API key not configured. AI suggestions will be limited.")
         else:
+            # Imported here: the SDK takes about half a second to load
+            import google.generativeai as genai
             self.enabled = True
             genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.model = genai.GenerativeModel(self.MODEL_NAME)
+        
+        self.client = None
+        if self.enabled:
+            self.client = ResilientLLMClient(
+                self.model,
+                timeout=timeout,
+                max_concurrency=max_concurrency,
+                max_retries=max_retries,
+                breaker=breaker or CircuitBreaker(),
+                scheduler=scheduler
+            )
     
-    def analyze_resume(self, resume_text, sections, ats_score):
+    def metrics(self):
+        """Gemini call metrics (latency, timeouts, breaker state) and fallback count"""
+        metrics = self.client.metrics() if self.client else {}
+        metrics['enabled'] = self.enabled
+        metrics['fallbacks'] = self._fallbacks
+        metrics['prompt_tokens'] = self._prompt_tokens
+        return metrics
+    
+    def analyze_resume(self, resume_text, sections, ats_score, breakdown=None, missing_skills=None,
+                       priority='interactive', section_spans=None):
         """
         Analyze resume using Gemini AI and provide actionable suggestions
         
@@ -33,42 +154,354 @@ class GeminiAnalyzer:
             resume_text: Full text of the resume
             sections: Detected sections dictionary
             ats_score: Current ATS score
+            breakdown: Optional ATS score breakdown by component
+            missing_skills: Optional keywords the resume is missing
+            priority: Scheduler priority ('interactive' or 'batch')
+            section_spans: Spans from the parse, so the prompt excerpt does
+                not segment the text again
             
         Returns:
             dict: AI-generated suggestions and insights
         """
         if not self.enabled:
-            return self._get_fallback_suggestions(ats_score, sections)
+            return self._fallback(ats_score, sections)
         
         try:
             # Construct intelligent prompt for Gemini
-            prompt = self._build_analysis_prompt(resume_text, sections, ats_score)
+            prompt = self._build_analysis_prompt(
+                resume_text, sections, ats_score, breakdown, missing_skills, section_spans
+            )
             
-            # Generate response
-            response = self.model.generate_content(prompt)
+            cache_key = self._cache_key(prompt)
+            if cache_key is not None:
+                cached = self.cache.get('suggestions', cache_key)
+                if cached is not None:
+                    return cached
+            
+            # Generate response (rate limits, deadline, retries and circuit breaker applied)
+            tokens = self._count_prompt_tokens(prompt) + self.OUTPUT_TOKENS
+            with stage('gemini'):
+                response = self.client.generate(prompt, priority=priority, tokens=tokens)
             
             # Parse and structure suggestions
             suggestions = self._parse_ai_response(response.text)
+            result = {'suggestions': suggestions}
+            
+            # Only real AI answers are cached; fallbacks are cheap to rebuild
+            if cache_key is not None and suggestions:
+                self.cache.set('suggestions', cache_key, result)
             
-            return {'suggestions': suggestions}
+            return result
             
+        except RateLimitedError as e:
+            print(f"Gemini call shed: {str(e)}")
+            return self._fallback(ats_score, sections, reason='rate_limited')
         except Exception as e:
-            print(f"Error calling Gemini API: {str(e)}")
+            print(f"Error calling Gemini API: {type(e).__name__}: {str(e)}")
             # Fallback to rule-based suggestions
-            return self._get_fallback_suggestions(ats_score, sections)
+            return self._fallback(ats_score, sections)
     
-    def _build_analysis_prompt(self, resume_text, sections, ats_score):
+    def analyze_batch(self, resumes):
+        """
+        Get suggestions for many resumes with as few Gemini calls as possible
+        
+        Resumes are packed into shared prompts (one instruction block, one
+        block per resume) within batch_size and batch_max_tokens. When an
+        answer covers only some resumes, the missing ones are retried together.
+        A failed call, or an answer covering none of them, gets the whole
+        group rule-based suggestions without further calls.
+        
+        Args:
+            resumes: List of dicts with 'id', 'text', 'sections', 'ats_score'
+                and optionally 'breakdown', 'missing_skills' and 'section_spans'
+            
+        Returns:
+            dict: Resume id mapped to {'suggestions': [...]}
+        """
+        results = {}
+        if not self.enabled:
+            for resume in resumes:
+                results[resume['id']] = self._fallback(resume['ats_score'], resume['sections'])
+            return results
+        
+        # Answers from earlier single or batch runs are reused per resume
+        pending = []
+        for resume in resumes:
+            cache_key = self._cache_key(self._build_analysis_prompt(
+                resume['text'],
+                resume['sections'],
+                resume['ats_score'],
+                resume.get('breakdown'),
+                resume.get('missing_skills'),
+                resume.get('section_spans')
+            ))
+            cached = self.cache.get('suggestions', cache_key) if cache_key is not None else None
+            if cached is not None:
+                results[resume['id']] = cached
+            else:
+                pending.append((resume, cache_key))
+        
+        for group in self._pack_batches(pending):
+            self._run_batch(group, results)
+        
+        return results
+    
+    def _pack_batches(self, pending):
+        """Greedily group resumes under the per-request size and token budgets"""
+        groups = []
+        group = []
+        tokens = self.prompt_builder.count_tokens(self._build_batch_prompt([]))
+        
+        for item in pending:
+            item_tokens = self.prompt_builder.count_tokens(self._format_batch_resume(item[0])) + self.BATCH_OUTPUT_TOKENS
+            if group and (len(group) >= self.batch_size or tokens + item_tokens > self.batch_max_tokens):
+                groups.append(group)
+                group = []
+                tokens = self.prompt_builder.count_tokens(self._build_batch_prompt([]))
+            group.append(item)
+            tokens += item_tokens
+        
+        if group:
+            groups.append(group)
+        return groups
+    
+    def _run_batch(self, group, results):
+        """
+        Analyze one packed group
+        
+        Only an answer that leaves some resumes out is retried, with just
+        the missing ones. When the call itself fails (deadline, open circuit,
+        transport error, rate limit) or the answer covers none of the group
+        (refusal, prose, malformed JSON), smaller batches would most likely
+        fail the same way at several times the cost, so the whole group gets
+        rule-based suggestions at once.
+        """
+        if len(group) == 1:
+            resume = group[0][0]
+            results[resume['id']] = self.analyze_resume(
+                resume['text'],
+                resume['sections'],
+                resume['ats_score'],
+                resume.get('breakdown'),
+                resume.get('missing_skills'),
+                priority='batch',
+                section_spans=resume.get('section_spans')
+            )
+            return
+        
+        try:
+            prompt = self._build_batch_prompt([resume for resume, _ in group])
+            output_tokens = self.BATCH_OUTPUT_TOKENS * len(group)
+            tokens = self._count_prompt_tokens(prompt) + output_tokens
+            with stage('gemini_batch'):
+                response = self.client.generate(
+                    prompt,
+                    priority='batch',
+                    tokens=tokens,
+                    generation_config={'max_output_tokens': output_tokens}
+                )
+            answers = self._parse_batch_response(response.text)
+        except RateLimitedError as e:
+            print(f"Gemini batch of {len(group)} shed: {str(e)}")
+            self._fallback_group(group, results, reason='rate_limited')
+            return
+        except Exception as e:
+            print(f"Error calling Gemini API for batch of {len(group)}: {type(e).__name__}: {str(e)}")
+            self._fallback_group(group, results)
+            return
+        
+        missing = []
+        for resume, cache_key in group:
+            suggestions = answers.get(str(resume['id']))
+            if suggestions:
+                results[resume['id']] = {'suggestions': suggestions}
+                if cache_key is not None:
+                    self.cache.set('suggestions', cache_key, results[resume['id']])
+            else:
+                missing.append((resume, cache_key))
+        
+        if not missing:
+            return
+        
+        if len(missing) < len(group):
+            # Partial answer: retry just the missing resumes together
+            self._run_batch(missing, results)
+        else:
+            print(f"Gemini answer for batch of {len(group)} covered none of its resumes")
+            self._fallback_group(missing, results)
+    
+    def _fallback_group(self, group, results, reason=None):
+        """Rule-based suggestions for every resume of a failed batch"""
+        for resume, _ in group:
+            results[resume['id']] = self._fallback(resume['ats_score'], resume['sections'], reason=reason)
+    
+    def _build_batch_prompt(self, resumes):
+        """
+        Build one prompt covering several resumes
+        
+        The instruction block comes first and is identical for every batch,
+        so it forms a stable prefix for any server-side prompt caching.
+        """
+        prompt = """You are an expert ATS (Applicant Tracking System) consultant and career coach.
+
+For EACH resume below, provide EXACTLY 5 specific, actionable suggestions to improve ATS compatibility and overall quality.
+
+**Instructions:**
+1. Provide EXACTLY 5 suggestions per resume
+2. Each suggestion should be specific to that resume and actionable
+3. Focus on ATS optimization, keyword usage, formatting, and impact
+4. Prioritize the most impactful changes
+5. Keep each suggestion concise (1-2 sentences)
+
+**Format your response as one JSON object keyed by resume id:**
+{"<id>": ["Suggestion 1", "Suggestion 2", "Suggestion 3", "Suggestion 4", "Suggestion 5"], ...}
+
+Provide only the JSON object, no additional text.
+"""
+        return prompt + ''.join(self._format_batch_resume(resume) for resume in resumes)
+    
+    def _format_batch_resume(self, resume):
+        """Prompt block for one resume in a batch"""
+        score_context = self.prompt_builder.format_score_context(
+            resume['ats_score'],
+            resume.get('breakdown'),
+            resume.get('missing_skills')
+        )
+        return f"""
+### Resume id: {resume['id']}
+{score_context}
+**Detected Sections:** {', '.join([k for k, v in resume['sections'].items() if v])}
+**Resume:**
+{self.prompt_builder.build_excerpt(resume['text'], resume.get('section_spans'))}
+"""
+    
+    def _parse_batch_response(self, response_text):
+        """
+        Parse a batch answer into {resume id: suggestions}
+        
+        Returns an empty dict when the answer is not a JSON object.
+        """
+        cleaned = response_text.strip()
+        if cleaned.startswith('```'):
+            cleaned = cleaned.split('```')[1]
+            if cleaned.startswith('json'):
+                cleaned = cleaned[4:]
+        
+        try:
+            answers = json.loads(cleaned.strip())
+        except json.JSONDecodeError:
+            return {}
+        
+        if not isinstance(answers, dict):
+            return {}
+        
+        return {
+            str(resume_id): [str(item).strip() for item in suggestions if str(item).strip()][:5]
+            for resume_id, suggestions in answers.items()
+            if isinstance(suggestions, list)
+        }
+    
+    def stream_suggestions(self, resume_text, sections, ats_score, breakdown=None, missing_skills=None,
+                           section_spans=None):
+        """
+        Yield suggestions one by one as Gemini streams them
+        
+        Each suggestion is yielded as soon as its JSON string closes, so the
+        first one reaches the client long before the full answer is done.
+        Falls back to rule-based suggestions if nothing usable arrives.
+        
+        Args:
+            resume_text: Full text of the resume
+            sections: Detected sections dictionary
+            ats_score: Current ATS score
+            breakdown: Optional ATS score breakdown by component
+            missing_skills: Optional keywords the resume is missing
+            section_spans: Spans from the parse, so the prompt excerpt does
+                not segment the text again
+            
+        Yields:
+            str: One suggestion at a time (at most 5)
+        """
+        if not self.enabled:
+            yield from self._fallback(ats_score, sections)['suggestions']
+            return
+        
+        prompt = self._build_analysis_prompt(
+            resume_text, sections, ats_score, breakdown, missing_skills, section_spans
+        )
+        cache_key = self._cache_key(prompt)
+        if cache_key is not None:
+            cached = self.cache.get('suggestions', cache_key)
+            if cached is not None:
+                yield from cached['suggestions']
+                return
+        
+        parser = SuggestionStreamParser()
+        suggestions = []
+        complete = False
+        reason = None
+        try:
+            tokens = self._count_prompt_tokens(prompt) + self.OUTPUT_TOKENS
+            # Includes the time the consumer spends on each yielded suggestion
+            with stage('gemini_stream'):
+                for chunk in self.client.stream(prompt, tokens=tokens):
+                    for suggestion in parser.feed(chunk.text):
+                        if len(suggestions) < 5:
+                            suggestions.append(suggestion)
+                            yield suggestion
+            complete = True
+        except RateLimitedError as e:
+            print(f"Gemini stream shed: {str(e)}")
+            reason = 'rate_limited'
+        except Exception as e:
+            print(f"Error streaming from Gemini API: {type(e).__name__}: {str(e)}")
+        
+        if suggestions:
+            if complete and cache_key is not None:
+                self.cache.set('suggestions', cache_key, {'suggestions': suggestions})
+            return
+        
+        # Not a JSON array (or the stream failed early): parse the whole text, then rules
+        suggestions = self._parse_ai_response(parser.text) if complete else []
+        if suggestions:
+            if cache_key is not None:
+                self.cache.set('suggestions', cache_key, {'suggestions': suggestions})
+        else:
+            suggestions = self._fallback(ats_score, sections, reason=reason)['suggestions']
+        yield from suggestions
+    
+    def _count_prompt_tokens(self, prompt):
+        """Add a prompt's locally estimated token count to the metrics and return it"""
+        tokens = self.prompt_builder.count_tokens(prompt)
+        with self._lock:
+            self._prompt_tokens += tokens
+        return tokens
+    
+    def _cache_key(self, prompt):
+        """Suggestion cache key for a prompt, or None without a cache"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(self.cache.hash_bytes(prompt.encode('utf-8')), self.MODEL_NAME)
+    
+    def _build_analysis_prompt(self, resume_text, sections, ats_score, breakdown=None, missing_skills=None,
+                               section_spans=None):
         """
         Build comprehensive prompt for Gemini to analyze resume
+        
+        The resume is reduced to its most useful sections within the prompt
+        token budget instead of being cut at a fixed character count.
         """
+        excerpt = self.prompt_builder.build_excerpt(resume_text, section_spans)
+        score_context = self.prompt_builder.format_score_context(ats_score, breakdown, missing_skills)
+        
         prompt = f"""You are an expert ATS (Applicant Tracking System) consultant and career coach.
 
 Analyze this resume and provide EXACTLY 5 specific, actionable suggestions to improve ATS compatibility and overall quality.
 
-**Resume Text:**
-{resume_text[:2000]}  
+**Resume (most relevant sections, trimmed to fit):**
+{excerpt}
 
-**Current ATS Score:** {ats_score}/100
+{score_context}
 
 **Detected Sections:** {', '.join([k for k, v in sections.items() if v])}
 
@@ -76,7 +509,7 @@ Analyze this resume and provide EXACTLY 5 specific, actionable suggestions to im
 1. Provide EXACTLY 5 suggestions
 2. Each suggestion should be specific and actionable
 3. Focus on ATS optimization, keyword usage, formatting, and impact
-4. Prioritize the most impactful changes
+4. Prioritize the most impactful changes, starting with the weakest score components and missing keywords
 5. Keep each suggestion concise (1-2 sentences)
 
 **Format your response as a JSON array:**
@@ -97,36 +530,36 @@ Provide only the JSON array, no additional text.
         """
         Parse Gemini's response and extract suggestions
         """
-        try:
-            # Try to parse as JSON
-            # Remove markdown code blocks if present
-            cleaned = response_text.strip()
-            if cleaned.startswith('```'):
-                cleaned = cleaned.split('```')[1]
-                if cleaned.startswith('json'):
-                    cleaned = cleaned[4:]
-            
-            suggestions = json.loads(cleaned.strip())
-            
-            # Ensure we have exactly 5 suggestions
-            if isinstance(suggestions, list):
-                return suggestions[:5] if len(suggestions) >= 5 else suggestions
-            
-            return []
-            
-        except json.JSONDecodeError:
-            # If JSON parsing fails, try to extract bullet points
-            lines = response_text.strip().split('\n')
-            suggestions = []
-            
-            for line in lines:
-                line = line.strip()
-                # Remove common prefixes
-                line = line.lstrip('•-*123456789. ')
-                if line and len(line) > 20:  # Meaningful suggestion
-                    suggestions.append(line)
-            
+        # Same incremental parser as the streaming path, fed the whole text;
+        # tolerates markdown code fences and truncated arrays
+        suggestions = SuggestionStreamParser().feed(response_text)
+        if suggestions:
             return suggestions[:5]
+        
+        # No JSON array: try to extract bullet points
+        lines = response_text.strip().split('\n')
+        
+        for line in lines:
+            line = line.strip()
+            # Remove common prefixes
+            line = line.lstrip('•-*123456789. ')
+            if line and len(line) > 20:  # Meaningful suggestion
+                suggestions.append(line)
+        
+        return suggestions[:5]
+    
+    def _fallback(self, ats_score, sections, reason=None):
+        """
+        Count and return rule-based suggestions
+        
+        Args:
+            reason: Metrics label ('rate_limited'); defaults to 'disabled'
+                without Gemini and 'error' otherwise
+        """
+        with self._lock:
+            self._fallbacks += 1
+        FALLBACKS.inc(reason=reason or ('disabled' if not self.enabled else 'error'))
+        return self._get_fallback_suggestions(ats_score, sections)
     
     def _get_fallback_suggestions(self, ats_score, sections):
         """
@@ -0,0 +1,268 @@
+"""
+Job Description Matcher Service
+Weights job-description terms with BM25 and scores resumes against them in bulk
+"""
+
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+from scipy import sparse
+
+
+class JobProfile:
+    """Precomputed, weighted term vector for one job description"""
+
+    def __init__(self, terms, weights):
+        """
+        Args:
+            terms: JD terms (unigrams and bigrams), highest weight first
+            weights: NumPy array of term weights aligned with terms
+        """
+        self.terms = terms
+        self.weights = weights
+        self.index = {term: position for position, term in enumerate(terms)}
+        self.total_weight = float(weights.sum()) or 1.0
+
+
+class JobDescriptionMatcher:
+    """BM25 relevance of resumes to a job description"""
+
+    # Keeps tech tokens such as node.js, ci/cd, c++ and c# intact
+    TOKEN_PATTERN = re.compile(r'[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]')
+
+    STOPWORDS = frozenset('''
+        a about above across after again all also an and any are as at be because been
+        being both but by can could do does doing during each either etc for from further
+        had has have having he her here his how i if in into is it its just may me more
+        most must my no nor not of off on once only or other our out over own per same
+        she should so some such than that the their them then there these they this
+        those through to too under until up upon us very via was we were what when where
+        which while who whom why will with within without would you your
+        ability able apply benefits candidate candidates company day desired environment
+        excellent experience familiarity good great ideal including join know knowledge
+        looking new opportunity plus preferred proficiency proficient qualifications
+        related required requirements responsibilities role seeking skills strong team
+        understanding using work working year years
+    '''.split())
+
+    def __init__(self, corpus_stats_path=None, k1=1.2, b=0.75, max_terms=60, cache_size=128):
+        """
+        Initialize the matcher
+
+        Args:
+            corpus_stats_path: Optional JSON file with document frequencies
+                ({"num_docs": N, "avg_doc_len": L, "df": {term: count}}),
+                e.g. built with build_corpus_stats over past resumes
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+            max_terms: Number of highest-weighted JD terms kept per profile
+            cache_size: Number of prepared job profiles kept in memory
+        """
+        self.k1 = k1
+        self.b = b
+        self.max_terms = max_terms
+        self.cache_size = cache_size
+
+        stats = {}
+        if corpus_stats_path:
+            with open(corpus_stats_path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+
+        self.num_docs = stats.get('num_docs', 0)
+        self.avg_doc_len = stats.get('avg_doc_len', 400)
+        self.document_frequency = stats.get('df', {})
+
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tokenize(self, text):
+        """Lower-case word tokens, including stopwords (they break n-grams)"""
+        return self.TOKEN_PATTERN.findall(text.lower())
+
+    def extract_terms(self, tokens):
+        """
+        Build unigram and bigram terms from tokens
+
+        Stopwords and bare numbers are dropped and never joined into a bigram.
+        """
+        terms = []
+        previous = None
+        for token in tokens:
+            if token in self.STOPWORDS or token.isdigit():
+                previous = None
+                continue
+            terms.append(token)
+            if previous is not None:
+                terms.append(previous + ' ' + token)
+            previous = token
+        return terms
+
+    def idf(self, term):
+        """BM25 inverse document frequency (uniform when no corpus stats are loaded)"""
+        num_docs = max(self.num_docs, 1)
+        df = self.document_frequency.get(term, 0)
+        return math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+    def prepare(self, job_description):
+        """
+        Return the weighted profile of a job description, cached by content
+
+        Args:
+            job_description: Job description text
+
+        Returns:
+            JobProfile: Top terms and their weights
+        """
+        key = hashlib.sha256(job_description.encode('utf-8')).hexdigest()
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is not None:
+                self._profiles.move_to_end(key)
+                return profile
+
+        counts = Counter(self.extract_terms(self.tokenize(job_description)))
+        weighted = sorted(
+            ((term, (1 + math.log(count)) * self.idf(term)) for term, count in counts.items()),
+            key=lambda item: (-item[1], item[0])
+        )[:self.max_terms]
+
+        profile = JobProfile(
+            terms=[term for term, _ in weighted],
+            weights=np.array([weight for _, weight in weighted], dtype=np.float64)
+        )
+
+        with self._lock:
+            self._profiles[key] = profile
+            while len(self._profiles) > self.cache_size:
+                self._profiles.popitem(last=False)
+
+        return profile
+
+    def term_matrix(self, profile, texts):
+        """
+        Build the sparse document-term count matrix over the profile's terms
+
+        Returns:
+            tuple: (CSR matrix of shape (len(texts), len(terms)), document lengths)
+        """
+        rows, cols, values = [], [], []
+        lengths = np.zeros(len(texts), dtype=np.float64)
+
+        for row, text in enumerate(texts):
+            tokens = self.tokenize(text)
+            lengths[row] = len(tokens)
+            counts = Counter(term for term in self.extract_terms(tokens) if term in profile.index)
+            for term, count in counts.items():
+                rows.append(row)
+                cols.append(profile.index[term])
+                values.append(count)
+
+        matrix = sparse.csr_matrix(
+            (np.array(values, dtype=np.float64), (rows, cols)),
+            shape=(len(texts), len(profile.terms))
+        )
+        return matrix, lengths
+
+    def score_matrix(self, profile, matrix, lengths):
+        """
+        Score every document row in one vectorized pass
+
+        Each term contributes its weight times its BM25 term-frequency factor,
+        capped at 1 so one keyword repeated many times cannot dominate.
+
+        Returns:
+            np.ndarray: Match scores from 0 to 100, one per row
+        """
+        if matrix.nnz == 0:
+            return np.zeros(matrix.shape[0])
+
+        norms = self.k1 * (1 - self.b + self.b * lengths / self.avg_doc_len)
+        row_norms = np.repeat(norms, np.diff(matrix.indptr))
+
+        saturated = matrix.copy()
+        saturated.data = np.minimum(
+            matrix.data * (self.k1 + 1) / (matrix.data + row_norms),
+            1.0
+        ) * profile.weights[matrix.indices]
+
+        totals = np.asarray(saturated.sum(axis=1)).ravel()
+        return totals / profile.total_weight * 100
+
+    def score(self, job_description, texts):
+        """
+        Score many resumes against one job description
+
+        Args:
+            job_description: Job description text (or a prepared JobProfile)
+            texts: Resume texts
+
+        Returns:
+            np.ndarray: Match scores from 0 to 100
+        """
+        profile = self._as_profile(job_description)
+        matrix, lengths = self.term_matrix(profile, texts)
+        return self.score_matrix(profile, matrix, lengths)
+
+    def match(self, job_description, text, limit=10):
+        """
+        Explain how one resume matches a job description
+
+        Returns:
+            dict: Match score plus matched and missing terms ranked by weight
+        """
+        profile = self._as_profile(job_description)
+        matrix, lengths = self.term_matrix(profile, [text])
+        score = self.score_matrix(profile, matrix, lengths)[0]
+
+        present = set(matrix.indices)
+        matched = [profile.terms[i] for i in range(len(profile.terms)) if i in present]
+        missing = [profile.terms[i] for i in range(len(profile.terms)) if i not in present]
+
+        return {
+            'score': round(float(score)),
+            'matched_terms': matched[:limit],
+            'missing_terms': missing[:limit]
+        }
+
+    def build_corpus_stats(self, texts, path=None):
+        """
+        Compute document frequencies over a corpus of resumes or job postings
+
+        Args:
+            texts: Iterable of documents
+            path: Optional JSON file to write the stats to
+
+        Returns:
+            dict: Stats in the format accepted by corpus_stats_path
+        """
+        df = Counter()
+        num_docs = 0
+        total_len = 0
+        for text in texts:
+            tokens = self.tokenize(text)
+            num_docs += 1
+            total_len += len(tokens)
+            df.update(set(self.extract_terms(tokens)))
+
+        stats = {
+            'num_docs': num_docs,
+            'avg_doc_len': total_len / num_docs if num_docs else 400,
+            'df': dict(df)
+        }
+
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(stats, f)
+
+        return stats
+
+    def _as_profile(self, job_description):
+        """Accept either JD text or an already prepared profile"""
+        if isinstance(job_description, JobProfile):
+            return job_description
+        return self.prepare(job_description)
@@ -0,0 +1,265 @@
+"""
+Job Queue Service
+Runs resume analyses in background worker threads and tracks their state in SQLite
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from contextlib import contextmanager
+
+
+class QueueFullError(Exception):
+    """Raised when the queue has no room for another job"""
+
+
+class Job:
+    """Handle given to a running job to publish partial results and timings"""
+
+    def __init__(self, job_queue, job_id):
+        self.job_queue = job_queue
+        self.id = job_id
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Time a named stage of the job (recorded in milliseconds)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+            self.job_queue._save(self.id, timings=self.timings)
+
+    def update(self, result):
+        """Publish a (partial) result that pollers can read immediately"""
+        self.job_queue._save(self.id, result=result)
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue with SQLite-backed status
+
+    Jobs hold their uploads in memory, so they cannot outlive the process
+    that accepted them. Each row records its owner's pid; when that process
+    is gone (recycled, redeployed, crashed), its queued and running jobs are
+    marked failed so pollers get an answer instead of waiting forever.
+    """
+
+    LOST_ERROR = 'The server restarted before this job finished; please submit it again'
+
+    def __init__(self, db_path=None, workers=2, max_pending=50, result_ttl=3600, stale_after=1800):
+        """
+        Initialize the job queue
+
+        Args:
+            db_path: SQLite file holding job state; shared by all worker
+                processes on the host so any of them can answer a poll
+            workers: Number of background worker threads
+            max_pending: Maximum queued (not yet running) jobs before
+                submissions are rejected
+            result_ttl: Seconds finished jobs are kept before cleanup
+            stale_after: Seconds without progress after which a queued or
+                running job is failed, even if its owner still runs
+        """
+        self.db_path = db_path or os.path.join(tempfile.gettempdir(), 'interats_jobs.db')
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        self._local = threading.local()
+        self._start_lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    timings TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner_pid INTEGER
+                )
+            ''')
+            # Databases created before jobs recorded their owner
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]
+            if 'owner_pid' not in columns:
+                conn.execute('ALTER TABLE jobs ADD COLUMN owner_pid INTEGER')
+
+        # Jobs left behind by processes that have since exited
+        self._fail_orphans()
+
+    def submit(self, func, *args):
+        """
+        Queue a job
+
+        Args:
+            func: Callable run as func(job, *args); its return value becomes
+                the final result
+            *args: Arguments passed to func
+
+        Returns:
+            str: The new job id
+
+        Raises:
+            QueueFullError: If max_pending jobs are already waiting
+        """
+        self._ensure_workers()
+
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, status, created_at, updated_at, owner_pid) VALUES (?, ?, ?, ?, ?)',
+                (job_id, 'queued', now, now, os.getpid())
+            )
+
+        try:
+            self._queue.put_nowait((job_id, func, args))
+        except queue.Full:
+            with self._connect() as conn:
+                conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+            raise QueueFullError('Too many jobs in progress, retry later')
+
+        return job_id
+
+    def get(self, job_id):
+        """
+        Return the current state of a job
+
+        Returns:
+            dict or None: status, result, error, timings and timestamps
+        """
+        row = self._connect().execute(
+            'SELECT id, status, result, error, timings, created_at, updated_at FROM jobs WHERE id = ?',
+            (job_id,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            'job_id': row[0],
+            'status': row[1],
+            'result': json.loads(row[2]) if row[2] else None,
+            'error': row[3],
+            'timings': json.loads(row[4]) if row[4] else {},
+            'created_at': row[5],
+            'updated_at': row[6]
+        }
+
+    def pending(self):
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize()
+
+    def _ensure_workers(self):
+        """Start worker threads on first use (after any worker fork)"""
+        if self._threads:
+            return
+
+        with self._start_lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        """Worker loop: run queued jobs one at a time"""
+        while True:
+            job_id, func, args = self._queue.get()
+            job = Job(self, job_id)
+            self._save(job_id, status='running')
+
+            try:
+                result = func(job, *args)
+                self._save(job_id, status='completed', result=result, timings=job.timings)
+            except Exception as e:
+                print(f"Error in job {job_id}: {str(e)}")
+                print(traceback.format_exc())
+                self._save(job_id, status='failed', error=str(e), timings=job.timings)
+            finally:
+                self._queue.task_done()
+                self._cleanup()
+
+    def _save(self, job_id, status=None, result=None, error=None, timings=None):
+        """Update the stored fields of a job that were given"""
+        fields = {'updated_at': time.time()}
+        if status is not None:
+            fields['status'] = status
+        if result is not None:
+            fields['result'] = json.dumps(result)
+        if error is not None:
+            fields['error'] = error
+        if timings is not None:
+            fields['timings'] = json.dumps(timings)
+
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._connect() as conn:
+            conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def _cleanup(self):
+        """Fail lost or stalled jobs and drop finished jobs older than the result TTL"""
+        self._fail_orphans()
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE status IN ('queued', 'running') AND updated_at < ?",
+                (self.LOST_ERROR, now, now - self.stale_after)
+            )
+            conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                (now - self.result_ttl,)
+            )
+
+    def _fail_orphans(self):
+        """Mark queued and running jobs of exited processes as failed"""
+        conn = self._connect()
+        owners = [
+            pid for (pid,) in conn.execute(
+                "SELECT DISTINCT owner_pid FROM jobs WHERE status IN ('queued', 'running')"
+            )
+            if pid != os.getpid() and not _process_alive(pid)
+        ]
+        if not owners:
+            return
+
+        with conn:
+            conn.executemany(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? "
+                "WHERE status IN ('queued', 'running') AND owner_pid IS ?",
+                [(self.LOST_ERROR, time.time(), pid) for pid in owners]
+            )
+
+    def _connect(self):
+        """Return this thread's SQLite connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+
+def _process_alive(pid):
+    """Whether the process that owns a job still runs (None: owner unknown, presumed gone)"""
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
@@ -0,0 +1,149 @@
+"""
+Keyword Matcher Service
+Finds every keyword of a taxonomy in a single pass over the resume text
+"""
+
+import re
+
+
+class KeywordMatcher:
+    """Single-pass, trie-compiled keyword index"""
+
+    def __init__(self, categories, aliases=None):
+        """
+        Build the keyword index once
+
+        Args:
+            categories: Dictionary mapping category name to a list of keywords
+            aliases: Optional dictionary mapping alias to canonical keyword
+                (e.g. 'k8s' -> 'kubernetes'); hits are reported under the
+                canonical keyword
+        """
+        self.categories = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                self.categories.setdefault(keyword, [])
+                if category not in self.categories[keyword]:
+                    self.categories[keyword].append(category)
+
+        # Surface form found in the text -> canonical keyword
+        self._canonical = {keyword: keyword for keyword in self.categories}
+        for alias, keyword in (aliases or {}).items():
+            alias, keyword = alias.lower(), keyword.lower()
+            if keyword in self.categories and alias not in self.categories:
+                self._canonical[alias] = keyword
+
+        trie = self._build_trie(self._canonical)
+
+        # Surface forms that are a word-bounded prefix of a longer one
+        # (e.g. "machine" inside "machine learning") start at the same
+        # position and are recovered from the longest hit
+        self._nested = {surface: self._prefixes(trie, surface) for surface in self._canonical}
+
+        self.pattern = self._compile(trie) if self._canonical else None
+
+    def find_all(self, text):
+        """
+        Find every keyword hit in one scan
+
+        Args:
+            text: Lower-cased resume text
+
+        Returns:
+            dict: Keyword mapped to the list of (start, end) offsets it occurs at
+        """
+        hits = {}
+        if self.pattern is None:
+            return hits
+
+        canonical = self._canonical
+        for match in self.pattern.finditer(text):
+            surface = match.group(1)
+            start = match.start(1)
+            hits.setdefault(canonical[surface], []).append((start, start + len(surface)))
+            for nested in self._nested[surface]:
+                hits.setdefault(canonical[nested], []).append((start, start + len(nested)))
+
+        return hits
+
+    def find_present(self, text):
+        """
+        Find which keywords occur, without offsets (cheaper than find_all)
+
+        Args:
+            text: Lower-cased resume text
+
+        Returns:
+            set: Canonical keywords present in the text
+        """
+        if self.pattern is None:
+            return set()
+
+        canonical = self._canonical
+        present = set()
+        for surface in set(self.pattern.findall(text)):
+            present.add(canonical[surface])
+            for nested in self._nested[surface]:
+                present.add(canonical[nested])
+        return present
+
+    @staticmethod
+    def _build_trie(surfaces):
+        """Build a character trie; the '' key marks the end of a surface form"""
+        trie = {}
+        for surface in surfaces:
+            node = trie
+            for char in surface:
+                node = node.setdefault(char, {})
+            node[''] = True
+        return trie
+
+    def _prefixes(self, trie, surface):
+        """List the shorter surface forms that end at a word boundary inside `surface`"""
+        prefixes = []
+        node = trie
+        for index, char in enumerate(surface[:-1]):
+            node = node[char]
+            if '' in node and self._is_boundary(char, surface[index + 1]):
+                prefixes.append(surface[:index + 1])
+        return prefixes
+
+    def _compile(self, trie):
+        """
+        Compile all keywords into one regex built from the character trie, so
+        each position is tried in time proportional to the keyword length
+        rather than the number of keywords
+        """
+        # Zero-width lookahead so overlapping keywords starting at later
+        # positions (e.g. "learning" inside "machine learning") are found too
+        return re.compile(r'\b(?=(' + self._trie_to_pattern(trie) + r')\b)')
+
+    def _trie_to_pattern(self, node):
+        """Convert a trie node into a regex fragment, preferring longer matches"""
+        terminal = '' in node
+        branches = [
+            re.escape(char) + self._trie_to_pattern(child)
+            for char, child in sorted(node.items()) if char
+        ]
+
+        if not branches:
+            return ''
+
+        if len(branches) == 1:
+            pattern = branches[0]
+            grouped = len(pattern) == 1 or (pattern.startswith('\\') and len(pattern) == 2)
+            if terminal:
+                return (pattern if grouped else '(?:' + pattern + ')') + '?'
+            return pattern
+
+        pattern = '(?:' + '|'.join(branches) + ')'
+        return pattern + '?' if terminal else pattern
+
+    @staticmethod
+    def _is_boundary(left, right):
+        """Check whether a regex word boundary falls between two characters"""
+        def is_word(char):
+            return char.isalnum() or char == '_'
+
+        return is_word(left) != is_word(right)
@@ -0,0 +1,63 @@
+"""
+Lazy Service
+Builds expensive service singletons (and their imports) on first use
+"""
+
+import threading
+import time
+
+
+class LazyService:
+    """
+    Proxy that builds its service on first attribute access
+
+    The proxy's own attributes are underscored (and instance() is the only
+    public method) so they never shadow the wrapped service's attributes.
+    """
+
+    def __init__(self, name, factory):
+        """
+        Args:
+            name: Service name shown in the startup report
+            factory: Callable returning the service; heavy imports belong
+                inside it so they are paid only when the service is used
+        """
+        self._name = name
+        self._build_ms = None
+        self._factory = factory
+        self._service = None
+        self._lock = threading.Lock()
+
+    def instance(self):
+        """Return the service, building it on the first call"""
+        service = self._service
+        if service is None:
+            with self._lock:
+                if self._service is None:
+                    start = time.perf_counter()
+                    self._service = self._factory()
+                    self._build_ms = round((time.perf_counter() - start) * 1000, 1)
+                    print(f"Started {self._name} in {self._build_ms} ms")
+                service = self._service
+        return service
+
+    def __getattr__(self, attribute):
+        # Only called for attributes the proxy itself does not have
+        return getattr(self.instance(), attribute)
+
+
+def startup_report(services, import_ms):
+    """
+    Summarize startup cost
+
+    Args:
+        services: LazyService proxies
+        import_ms: Time taken to import the application module
+
+    Returns:
+        dict: Import time and per-service build time (None if not built yet)
+    """
+    return {
+        'import_ms': import_ms,
+        'services': {service._name: service._build_ms for service in services}
+    }
@@ -0,0 +1,357 @@
+"""
+LLM Client Service
+Deadline-bound, retrying, circuit-breaking wrapper around a generative model
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from services.llm_scheduler import RateLimitedError
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker rejects a call without trying it"""
+
+
+class LLMTimeoutError(Exception):
+    """Raised when a call does not finish before its deadline"""
+
+
+class CircuitBreaker:
+    """Opens when the recent error rate spikes, then probes after a cooldown"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=5, cooldown=30.0):
+        """
+        Args:
+            failure_rate: Fraction of failed calls in the window that opens the circuit
+            window: Number of most recent calls considered
+            min_calls: Calls needed in the window before the breaker may open
+            cooldown: Seconds to stay open before letting a probe call through
+        """
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._results = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Decide whether a call may go ahead"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+
+            return True
+
+    def record(self, success):
+        """Record the outcome of an allowed call"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if success:
+                    self.state = self.CLOSED
+                    self._results.clear()
+                else:
+                    self._open()
+                return
+
+            self._results.append(success)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate:
+                self._open()
+
+    def release(self):
+        """Give back an allowed call that never reached the model"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _open(self):
+        """Trip the breaker (caller holds the lock)"""
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._results.clear()
+
+
+class ResilientLLMClient:
+    """Run generate_content calls on a bounded pool with deadlines and retries"""
+
+    # HTTP-style status codes worth retrying (rate limit, server errors, gateway timeouts)
+    TRANSIENT_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(self, model, timeout=15.0, max_concurrency=8, max_retries=2,
+                 backoff_base=0.5, breaker=None, scheduler=None):
+        """
+        Args:
+            model: Object exposing generate_content(prompt, **kwargs), e.g. a
+                genai.GenerativeModel or a local fake for tests
+            timeout: Default per-call deadline in seconds, retries included
+            max_concurrency: Maximum calls in flight at once
+            max_retries: Retries on transient errors
+            backoff_base: Base delay in seconds for full-jitter exponential backoff
+            breaker: Optional CircuitBreaker (one with defaults is created)
+            scheduler: Optional LLMScheduler every attempt must be admitted
+                by (rate and token limits shared across processes)
+        """
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker()
+        self.scheduler = scheduler
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='llm')
+        self._latencies = deque(maxlen=500)
+        self._lock = threading.Lock()
+        self._counters = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'retries': 0,
+            'short_circuited': 0,
+            'shed': 0
+        }
+
+    def generate(self, prompt, timeout=None, priority='interactive', tokens=0, **kwargs):
+        """
+        Call the model, retrying transient errors until the deadline
+
+        Args:
+            prompt: Prompt passed to generate_content
+            timeout: Deadline in seconds for this call (defaults to self.timeout)
+            priority: Scheduler priority ('interactive' or 'batch')
+            tokens: Estimated tokens (prompt and output) reserved with the scheduler
+            **kwargs: Extra generate_content arguments
+
+        Returns:
+            The model response
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            RateLimitedError: If the scheduler cannot admit the call in time
+            LLMTimeoutError: If the deadline passes
+            Exception: The last error if it was not transient or retries ran out
+        """
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError('LLM circuit breaker is open')
+
+        self._count('calls')
+        deadline = time.monotonic() + (timeout or self.timeout)
+        start = time.monotonic()
+        attempt = 0
+
+        while True:
+            self._admit(tokens, priority, deadline, attempt, start)
+            remaining = deadline - time.monotonic()
+            future = self._executor.submit(self.model.generate_content, prompt, **kwargs)
+            try:
+                response = future.result(timeout=max(remaining, 0))
+            except FutureTimeoutError:
+                # The worker thread cannot be interrupted; it finishes in the background
+                future.cancel()
+                self._count('timeouts')
+                self._finish(False, start)
+                raise LLMTimeoutError(f'LLM call exceeded its {timeout or self.timeout}s deadline')
+            except Exception as e:
+                self._throttle_on_rate_limit(e)
+                delay = random.uniform(0, self.backoff_base * (2 ** attempt))
+                if (
+                    attempt < self.max_retries
+                    and self.is_transient(e)
+                    and time.monotonic() + delay < deadline
+                ):
+                    attempt += 1
+                    self._count('retries')
+                    time.sleep(delay)
+                    continue
+                self._finish(False, start)
+                raise
+
+            self._finish(True, start)
+            self._settle(response, tokens)
+            return response
+
+    def stream(self, prompt, timeout=None, priority='interactive', tokens=0, **kwargs):
+        """
+        Stream response chunks as the model produces them
+
+        The call runs on the pool and hands chunks over through a queue, so
+        the deadline also bounds the wait for each chunk. Transient errors
+        are retried only until the first chunk has been yielded.
+
+        Args:
+            prompt: Prompt passed to generate_content(stream=True)
+            timeout: Deadline in seconds for the whole stream
+            priority: Scheduler priority ('interactive' or 'batch')
+            tokens: Estimated tokens (prompt and output) reserved with the scheduler
+
+        Yields:
+            Response chunks (objects with .text)
+
+        Raises:
+            CircuitOpenError, RateLimitedError, LLMTimeoutError or the
+            model error, as generate
+        """
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError('LLM circuit breaker is open')
+
+        self._count('calls')
+        deadline = time.monotonic() + (timeout or self.timeout)
+        start = time.monotonic()
+        attempt = 0
+        yielded = False
+
+        while True:
+            self._admit(tokens, priority, deadline, attempt, start)
+            chunks = queue.Queue()
+            cancelled = threading.Event()
+            self._executor.submit(self._pump, prompt, kwargs, chunks, cancelled)
+            try:
+                while True:
+                    try:
+                        kind, value = chunks.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        cancelled.set()
+                        self._count('timeouts')
+                        self._finish(False, start)
+                        raise LLMTimeoutError(f'LLM stream exceeded its {timeout or self.timeout}s deadline')
+                    if kind == 'chunk':
+                        yielded = True
+                        yield value
+                    elif kind == 'error':
+                        raise value
+                    else:
+                        self._finish(True, start)
+                        return
+            except LLMTimeoutError:
+                raise
+            except GeneratorExit:
+                # Consumer stopped reading; let the worker drain and exit
+                cancelled.set()
+                self._finish(True, start)
+                raise
+            except Exception as e:
+                self._throttle_on_rate_limit(e)
+                delay = random.uniform(0, self.backoff_base * (2 ** attempt))
+                if (
+                    not yielded
+                    and attempt < self.max_retries
+                    and self.is_transient(e)
+                    and time.monotonic() + delay < deadline
+                ):
+                    attempt += 1
+                    self._count('retries')
+                    time.sleep(delay)
+                    continue
+                self._finish(False, start)
+                raise
+
+    def is_transient(self, error):
+        """Whether an error is worth retrying (rate limits, 5xx, network errors)"""
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        return self._status_code(error) in self.TRANSIENT_CODES
+
+    @staticmethod
+    def _status_code(error):
+        """HTTP-style status code of an API error, if it has one"""
+        code = getattr(error, 'code', None)
+        if callable(code):
+            code = code()
+        return getattr(code, 'value', code)
+
+    def metrics(self):
+        """Counters, latency percentiles (ms) and breaker state"""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000, 1)
+
+        counters.update({
+            'latency_p50_ms': percentile(0.50),
+            'latency_p95_ms': percentile(0.95),
+            'latency_p99_ms': percentile(0.99),
+            'breaker_state': self.breaker.state
+        })
+        if self.scheduler is not None:
+            counters['scheduler'] = self.scheduler.metrics()
+        return counters
+
+    def _pump(self, prompt, kwargs, chunks, cancelled):
+        """Worker side of stream: push chunks, then a final 'done' or 'error'"""
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True, **kwargs):
+                if cancelled.is_set():
+                    return
+                chunks.put(('chunk', chunk))
+            chunks.put(('done', None))
+        except Exception as e:
+            chunks.put(('error', e))
+
+    def _admit(self, tokens, priority, deadline, attempt, start):
+        """
+        Wait for the scheduler to admit an attempt, within the call deadline
+
+        A call shed before its first attempt never reached the model, so it
+        does not count against the breaker; one shed on a retry failed.
+        """
+        if self.scheduler is None:
+            return
+        try:
+            self.scheduler.acquire(tokens, priority, timeout=max(deadline - time.monotonic(), 0))
+        except RateLimitedError:
+            self._count('shed')
+            if attempt:
+                self._finish(False, start)
+            else:
+                self.breaker.release()
+            raise
+
+    def _throttle_on_rate_limit(self, error):
+        """Make every process back off when the API itself answers 429"""
+        if self.scheduler is not None and self._status_code(error) == 429:
+            self.scheduler.throttle()
+
+    def _settle(self, response, tokens):
+        """Replace the reserved token estimate with the reported usage, when the SDK reports it"""
+        usage = getattr(response, 'usage_metadata', None)
+        used = getattr(usage, 'total_token_count', None)
+        if self.scheduler is not None and isinstance(used, int) and used:
+            self.scheduler.adjust(tokens - used)
+
+    def _finish(self, success, start):
+        """Record the outcome of a call in the breaker and the metrics"""
+        self.breaker.record(success)
+        with self._lock:
+            self._counters['successes' if success else 'failures'] += 1
+            self._latencies.append(time.monotonic() - start)
+
+    def _count(self, name):
+        """Increment a counter"""
+        with self._lock:
+            self._counters[name] += 1
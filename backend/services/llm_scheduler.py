@@ -0,0 +1,285 @@
+"""
+LLM Scheduler Service
+Requests-per-minute and tokens-per-minute token buckets shared by every worker process
+"""
+
+import os
+import sqlite3
+import tempfile
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+from services.metrics import REGISTRY
+
+
+QUEUE_SECONDS = REGISTRY.histogram(
+    'interats_llm_queue_seconds', 'Time LLM calls waited for rate limit capacity', ['priority']
+)
+SHED = REGISTRY.counter(
+    'interats_llm_shed_total', 'LLM calls rejected because their queue wait would pass the deadline', ['priority']
+)
+
+
+class RateLimitedError(Exception):
+    """Raised when a call would wait for capacity past its deadline"""
+
+
+class LLMScheduler:
+    """
+    Token-bucket admission for model calls, in priority order across processes
+
+    Bucket levels and the waiting calls live in SQLite, so every gunicorn
+    worker on the host draws from the same per-minute budgets instead of
+    each bursting into the API's rate limits. A call is admitted when no
+    higher-priority (or older, same-priority) call is waiting and both
+    buckets hold enough; otherwise it sleeps until the buckets should have
+    refilled. It is rejected as soon as the estimated wait for everything
+    ahead of it passes its deadline.
+    """
+
+    # Lower runs first
+    PRIORITIES = {'interactive': 0, 'batch': 1}
+
+    def __init__(self, requests_per_minute, tokens_per_minute, db_path=None, max_wait=None,
+                 poll_interval=0.05):
+        """
+        Args:
+            requests_per_minute: Request budget (0 disables the request bucket)
+            tokens_per_minute: Token budget, prompt plus expected output
+                (0 disables the token bucket)
+            db_path: SQLite file holding the shared state
+            max_wait: Dictionary of priority to the longest queue wait in
+                seconds before a call is shed (defaults: interactive 5, batch 10)
+            poll_interval: Shortest sleep between admission checks; waiters
+                otherwise sleep until the buckets should have refilled for
+                them, so they do not keep contending for the write lock
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.db_path = db_path or os.path.join(tempfile.gettempdir(), 'interats_llm.db')
+        self.max_wait = {'interactive': 5.0, 'batch': 10.0, **(max_wait or {})}
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._waits = {priority: deque(maxlen=500) for priority in self.PRIORITIES}
+        self._counters = {'admitted': 0, 'shed': 0, 'throttled': 0}
+
+        with self._transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    level REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS waiters (
+                    id TEXT PRIMARY KEY,
+                    priority INTEGER NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    deadline REAL NOT NULL,
+                    tokens REAL NOT NULL
+                )
+            ''')
+
+    def acquire(self, tokens=0, priority='interactive', timeout=None):
+        """
+        Wait for one request and `tokens` tokens of budget
+
+        Args:
+            tokens: Estimated tokens the call will use
+            priority: 'interactive' or 'batch'
+            timeout: Seconds the caller can wait at most (further capped by
+                max_wait for the priority)
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            RateLimitedError: If the estimated wait would pass the deadline
+        """
+        rank = self.PRIORITIES[priority]
+        max_wait = self.max_wait[priority] if timeout is None else min(timeout, self.max_wait[priority])
+        tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+        start = time.time()
+        deadline = start + max_wait
+        ticket = uuid.uuid4().hex
+
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO waiters (id, priority, enqueued_at, deadline, tokens) VALUES (?, ?, ?, ?, ?)',
+                (ticket, rank, start, deadline, tokens)
+            )
+
+        outcome = None
+        try:
+            while True:
+                with self._transaction() as conn:
+                    now = time.time()
+                    # Tickets of crashed or interrupted callers
+                    conn.execute('DELETE FROM waiters WHERE deadline < ? AND id != ?', (now, ticket))
+                    requests, budget = self._levels(conn, now)
+                    calls_ahead, tokens_ahead = conn.execute(
+                        '''SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM waiters
+                           WHERE priority < ? OR (priority = ? AND (enqueued_at < ? OR (enqueued_at = ? AND id < ?)))''',
+                        (rank, rank, start, start, ticket)
+                    ).fetchone()
+
+                    if calls_ahead == 0 and requests >= 1 and budget >= tokens:
+                        self._store(conn, now, requests - 1, budget - tokens)
+                        conn.execute('DELETE FROM waiters WHERE id = ?', (ticket,))
+                        outcome = 'admitted'
+                    else:
+                        wait = self._refill_time(calls_ahead + 1 - requests, tokens_ahead + tokens - budget)
+                        if now + wait > deadline:
+                            conn.execute('DELETE FROM waiters WHERE id = ?', (ticket,))
+                            outcome = 'shed'
+
+                if outcome == 'admitted':
+                    waited = time.time() - start
+                    self._record(priority, waited, outcome)
+                    return waited
+                if outcome == 'shed':
+                    self._record(priority, time.time() - start, outcome)
+                    raise RateLimitedError(
+                        f'LLM rate limit: {priority} call would wait {wait:.1f}s, more than its {max_wait:.1f}s deadline'
+                    )
+
+                # Sleep until our turn should have come, jittered so waiters
+                # behind the same refill do not all wake up together
+                pause = max(wait, self.poll_interval) * random.uniform(1.0, 1.2)
+                time.sleep(min(pause, max(deadline - time.time(), self.poll_interval)))
+        finally:
+            if outcome is None:
+                # Interrupted while waiting; do not hold up the calls behind
+                with self._transaction() as conn:
+                    conn.execute('DELETE FROM waiters WHERE id = ?', (ticket,))
+
+    def adjust(self, tokens):
+        """
+        Correct the token bucket once a call's real usage is known
+
+        Args:
+            tokens: Estimated minus actual tokens (negative when the call
+                used more than was reserved)
+        """
+        if not self.tokens_per_minute or not tokens:
+            return
+        with self._transaction() as conn:
+            now = time.time()
+            requests, budget = self._levels(conn, now)
+            self._store(conn, now, requests, budget + tokens)
+
+    def throttle(self):
+        """
+        Empty the request bucket after the API answered 429
+
+        The budget is shared with callers outside this host, so the API's
+        own limit wins: every process waits for the bucket to refill.
+        """
+        with self._transaction() as conn:
+            now = time.time()
+            _, budget = self._levels(conn, now)
+            self._store(conn, now, 0, budget)
+        with self._lock:
+            self._counters['throttled'] += 1
+
+    def metrics(self):
+        """Budgets, admission counters and queue wait percentiles (ms) per priority"""
+        with self._lock:
+            metrics = dict(self._counters)
+            waits = {priority: sorted(samples) for priority, samples in self._waits.items()}
+
+        def percentile(values, fraction):
+            if not values:
+                return 0.0
+            return round(values[min(int(len(values) * fraction), len(values) - 1)] * 1000, 1)
+
+        metrics.update({
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'waiting': self._connect().execute('SELECT COUNT(*) FROM waiters').fetchone()[0]
+        })
+        for priority, values in waits.items():
+            metrics[f'{priority}_wait_p50_ms'] = percentile(values, 0.50)
+            metrics[f'{priority}_wait_p95_ms'] = percentile(values, 0.95)
+        return metrics
+
+    def _levels(self, conn, now):
+        """Current (requests, tokens) in the buckets, refilled up to now"""
+        rows = dict(
+            (name, (level, updated_at))
+            for name, level, updated_at in conn.execute('SELECT name, level, updated_at FROM buckets')
+        )
+
+        def level(name, per_minute):
+            if not per_minute:
+                return float('inf')
+            if name not in rows:
+                return float(per_minute)
+            stored, updated_at = rows[name]
+            return min(per_minute, stored + max(now - updated_at, 0) * per_minute / 60)
+
+        return level('requests', self.requests_per_minute), level('tokens', self.tokens_per_minute)
+
+    def _store(self, conn, now, requests, tokens):
+        """Write both bucket levels (caller holds the transaction)"""
+        for name, level, per_minute in (
+            ('requests', requests, self.requests_per_minute),
+            ('tokens', tokens, self.tokens_per_minute)
+        ):
+            if per_minute:
+                conn.execute(
+                    'INSERT OR REPLACE INTO buckets (name, level, updated_at) VALUES (?, ?, ?)',
+                    (name, level, now)
+                )
+
+    def _refill_time(self, requests_short, tokens_short):
+        """Seconds until both buckets have refilled by the given shortfalls"""
+        wait = 0.0
+        if self.requests_per_minute and requests_short > 0:
+            wait = max(wait, requests_short * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and tokens_short > 0:
+            wait = max(wait, tokens_short * 60 / self.tokens_per_minute)
+        return wait
+
+    def _record(self, priority, waited, outcome):
+        """Count an admission or shed call and its queue wait"""
+        QUEUE_SECONDS.observe(waited, priority=priority)
+        if outcome == 'shed':
+            SHED.inc(priority=priority)
+        with self._lock:
+            self._counters[outcome] += 1
+            if outcome == 'admitted':
+                self._waits[priority].append(waited)
+
+    @contextmanager
+    def _transaction(self):
+        """Serialize a read-modify-write across processes (BEGIN IMMEDIATE)"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _connect(self):
+        """
+        Return this thread's SQLite connection
+
+        The scheduler is built in the gunicorn master during warmup, so a
+        connection inherited through fork is replaced, never shared.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
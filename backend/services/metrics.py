@@ -0,0 +1,432 @@
+"""
+Metrics Service
+Latency histograms and counters, merged across worker processes and rendered in Prometheus text format
+"""
+
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Seconds; spans the sub-millisecond scoring components up to slow Gemini calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+# Bytes; uploads are capped at a few MB
+SIZE_BUCKETS = (
+    10240, 51200, 102400, 262144, 524288, 1048576, 2097152, 5242880, 10485760
+)
+
+
+def _escape(value):
+    """Escape a label value for the text exposition format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    """Render {name="value",...} (empty string when there are no labels)"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_count(value):
+    """Render a count summed by SQLite (a float) as an integer when whole"""
+    return int(value) if float(value).is_integer() else value
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    TYPE = 'counter'
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add to the counter for one label combination"""
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Current value for one label combination (this process only)"""
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        return self._values.get(key, 0)
+
+    def snapshot(self):
+        """Rows of (label values, field, value) for the shared store"""
+        with self._lock:
+            return [(key, 'value', value) for key, value in self._values.items()]
+
+    def reset(self):
+        """Forget every value (a forked worker starts from zero)"""
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def samples(self, rows=None):
+        """
+        Exposition lines for every label combination
+
+        Args:
+            rows: Snapshot rows merged across processes (defaults to this
+                process's own values)
+        """
+        values = sorted((key, value) for key, _, value in (self.snapshot() if rows is None else rows))
+        return [
+            f'{self.name}{_format_labels(self.label_names, key)} {_format_count(value)}'
+            for key, value in values
+        ]
+
+
+class Histogram:
+    """Bucketed distribution (cumulative buckets, sum and count) with optional labels"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation"""
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        """Number of observations for one label combination (this process only)"""
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        series = self._series.get(key)
+        return sum(series[0]) if series else 0
+
+    def snapshot(self):
+        """Rows of (label values, field, value): one per bucket index, plus 'sum'"""
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+
+        rows = []
+        for key, counts, total in series:
+            rows.extend((key, str(index), count) for index, count in enumerate(counts))
+            rows.append((key, 'sum', total))
+        return rows
+
+    def reset(self):
+        """Forget every observation (a forked worker starts from zero)"""
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def samples(self, rows=None):
+        """
+        Exposition lines: cumulative _bucket series, _sum and _count
+
+        Args:
+            rows: Snapshot rows merged across processes (defaults to this
+                process's own values)
+        """
+        merged = {}
+        for key, field, value in (self.snapshot() if rows is None else rows):
+            series = merged.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            if field == 'sum':
+                series[1] += value
+            elif int(field) < len(series[0]):
+                # Rows stored by a deploy with more buckets are dropped
+                series[0][int(field)] += int(value)
+
+        lines = []
+        for key, (counts, total) in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels(self.label_names, key, f'le="{le}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named collection of metrics, optionally merged across processes
+
+    Without share(), a process renders only its own values. With it, every
+    process writes its cumulative values to a SQLite file under its own
+    process key every flush_interval seconds, and render() sums the rows of
+    all of them, so whichever gunicorn worker answers a scrape reports
+    host-wide totals. Rows of workers that have exited (recycled after
+    max_requests, crashed) are folded into a 'retired' row rather than
+    dropped, so counters never go backwards.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.db_path = None
+        self.flush_interval = 5.0
+        self._db_lock = threading.RLock()
+        self._conn = None
+        self._process = None
+        self._flusher_pid = None
+
+    def counter(self, name, help_text, label_names=()):
+        """Get or create a counter"""
+        return self._register(Counter, name, help_text, label_names)
+
+    def histogram(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        """Get or create a histogram"""
+        return self._register(Histogram, name, help_text, label_names, buckets=buckets)
+
+    def share(self, db_path, flush_interval=5.0):
+        """
+        Merge this registry with every process writing to the same file
+
+        Args:
+            db_path: SQLite file shared by the workers on the host
+            flush_interval: Seconds between writes of this process's values;
+                a scrape sees the other workers' values at most this old
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+
+    def start(self):
+        """Start this process's background flusher (once per process)"""
+        if not self.db_path or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True).start()
+
+    def flush(self):
+        """Write this process's current values to the shared file"""
+        if not self.db_path:
+            return
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        with self._transaction() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO metric_values (process, pid, metric, labels, field, value) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (self._process, os.getpid(), metric.name, json.dumps(key), field, value)
+                    for metric in metrics
+                    for key, field, value in metric.snapshot()
+                ]
+            )
+            self._retire_exited(conn)
+
+    def clear_shared(self):
+        """Delete every stored value, e.g. when the server starts"""
+        if not self.db_path:
+            return
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM metric_values')
+
+    def reset(self):
+        """Forget this process's values and connection (runs in forked children)"""
+        self._lock = threading.Lock()
+        self._db_lock = threading.RLock()
+        for metric in self._metrics.values():
+            metric.reset()
+        self._conn = None
+        self._process = None
+        self._flusher_pid = None
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4)
+
+        Returns:
+            str: HELP/TYPE headers followed by the samples of each metric
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        merged = self._merged_rows() if self.db_path else None
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+            lines.extend(metric.samples(None if merged is None else merged.get(metric.name, [])))
+        return '\n'.join(lines) + '\n'
+
+    def _merged_rows(self):
+        """Flush this process, then sum the rows of all: metric name -> rows"""
+        self.flush()
+        with self._db_lock:
+            rows = self._connect().execute(
+                'SELECT metric, labels, field, SUM(value) FROM metric_values GROUP BY metric, labels, field'
+            ).fetchall()
+
+        merged = {}
+        for name, labels, field, value in rows:
+            merged.setdefault(name, []).append((tuple(json.loads(labels)), field, value))
+        return merged
+
+    def _retire_exited(self, conn):
+        """Fold the rows of exited processes into the 'retired' process (caller holds the transaction)"""
+        processes = conn.execute(
+            "SELECT DISTINCT process, pid FROM metric_values WHERE process != 'retired'"
+        ).fetchall()
+        for process, pid in processes:
+            if _process_alive(pid):
+                continue
+            conn.execute(
+                "INSERT INTO metric_values (process, pid, metric, labels, field, value) "
+                "SELECT 'retired', 0, metric, labels, field, value FROM metric_values WHERE process = ? "
+                "ON CONFLICT (process, metric, labels, field) DO UPDATE SET value = value + excluded.value",
+                (process,)
+            )
+            conn.execute('DELETE FROM metric_values WHERE process = ?', (process,))
+
+    def _flush_loop(self):
+        """Flusher thread body"""
+        pid = os.getpid()
+        while True:
+            time.sleep(self.flush_interval)
+            if self._flusher_pid != pid:
+                return
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Warning: could not flush metrics: {str(e)}")
+
+    @contextmanager
+    def _transaction(self):
+        """Serialize a write across processes (BEGIN IMMEDIATE)"""
+        with self._db_lock:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def _connect(self):
+        """
+        Return this process's SQLite connection
+
+        The registry exists before gunicorn forks; reset() drops the inherited
+        connection in each worker, which opens its own with a fresh process
+        key, so a reused pid never overwrites an exited worker's rows.
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS metric_values (
+                    process TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    metric TEXT NOT NULL,
+                    labels TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    value REAL NOT NULL,
+                    PRIMARY KEY (process, metric, labels, field)
+                )
+            ''')
+            self._process = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+            self._conn = conn
+        return self._conn
+
+    def _register(self, metric_class, name, help_text, label_names, **kwargs):
+        """Return the metric with this name, creating it on first use"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help_text, label_names, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as a {metric.TYPE}")
+            return metric
+
+
+def _process_alive(pid):
+    """Whether a process with this pid still runs on the host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# Process-wide registry; app.py calls share() so gunicorn workers report host-wide totals
+REGISTRY = MetricsRegistry()
+
+# A forked worker starts from zero instead of adding the master's warmup
+# observations to the totals once per worker
+os.register_at_fork(after_in_child=REGISTRY.reset)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'interats_stage_seconds', 'Time spent in each processing stage', ['stage']
+)
+
+# Stage timings of the current request, for the Server-Timing header
+_request_timings = ContextVar('request_timings', default=None)
+
+
+@contextmanager
+def stage(name):
+    """
+    Time a block into the stage histogram (and the current request's timings)
+
+    Args:
+        name: Stage name, e.g. 'parse_extract' or 'score_keywords'
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def start_request_timing():
+    """Start collecting stage timings for the current request"""
+    _request_timings.set([])
+
+
+def request_timings():
+    """
+    Stage timings collected since start_request_timing
+
+    Returns:
+        list: (stage, seconds) pairs in the order the stages finished,
+            repeated stages summed
+    """
+    totals = {}
+    for name, elapsed in _request_timings.get() or []:
+        totals[name] = totals.get(name, 0.0) + elapsed
+    return list(totals.items())
@@ -0,0 +1,93 @@
+"""
+Profiler Service
+Low-overhead sampling profiler for a single request thread
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval from a background thread"""
+
+    def __init__(self, thread_id=None, interval=0.005, max_depth=64):
+        """
+        Args:
+            thread_id: Thread to sample (defaults to the calling thread)
+            interval: Seconds between samples
+            max_depth: Deepest stack frames kept per sample
+        """
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling"""
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and wait for the sampler thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def folded(self):
+        """
+        Samples in collapsed-stack format ('outer;inner count' per line),
+        readable by flamegraph.pl and speedscope
+        """
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def top(self, limit=10):
+        """
+        Functions most often on top of the stack
+
+        Returns:
+            list: (function, share of samples) pairs, hottest first
+        """
+        if not self.samples:
+            return []
+
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return [(name, round(count / self.samples, 3)) for name, count in leaves.most_common(limit)]
+
+    def write(self, path):
+        """Write the folded stacks to a file"""
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.folded())
+        return path
+
+    def _run(self):
+        """Sampler loop"""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self.stacks[self._describe(frame)] += 1
+            self.samples += 1
+
+    def _describe(self, frame):
+        """Collapse a frame chain into 'module:function;...' from the outermost frame"""
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
@@ -0,0 +1,153 @@
+"""
+Prompt Builder Service
+Fits the most useful parts of a resume into a token budget for LLM prompts
+"""
+
+import re
+
+from services.resume_parser import ResumeParser
+
+
+class PromptBuilder:
+    """Token-budgeted resume excerpts and score context for Gemini prompts"""
+
+    # Words, numbers and single punctuation marks
+    TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+
+    # Sections in the order they are worth spending tokens on; 'header' is
+    # the text before the first section (name, contact details)
+    SECTION_PRIORITY = [
+        'experience', 'skills', 'summary', 'projects', 'education',
+        'certifications', 'achievements', 'resume', 'contact', 'header'
+    ]
+
+    # Tokens allowed for the header, which rarely helps the suggestions
+    HEADER_TOKENS = 40
+
+    def __init__(self, max_tokens=800):
+        """
+        Args:
+            max_tokens: Estimated token budget for the resume excerpt
+        """
+        self.max_tokens = max_tokens
+        # Only needed for callers that do not pass the parse's section spans
+        self._parser = None
+
+    def count_tokens(self, text):
+        """
+        Estimate the number of model tokens in a text locally
+
+        Each word counts as one token plus one per further 6 characters
+        (long words split into several subword tokens); each punctuation
+        mark counts as one.
+        """
+        return sum(1 + (len(token) - 1) // 6 for token in self.TOKEN_PATTERN.findall(text))
+
+    def build_excerpt(self, text, section_spans=None, max_tokens=None):
+        """
+        Select the highest-value section spans that fit the budget
+
+        Every section gets a fair share of the budget in priority order;
+        sections shorter than their share give the rest to the others.
+
+        Args:
+            text: Cleaned resume text
+            section_spans: Spans from ResumeParser.segment_sections (the
+                text is segmented here when they are not given)
+            max_tokens: Budget override (defaults to self.max_tokens)
+
+        Returns:
+            str: Labelled excerpt in document order
+        """
+        budget = max_tokens or self.max_tokens
+        spans = self._locate_sections(text, section_spans)
+
+        needs = []
+        for name, start, end in spans:
+            need = self.count_tokens(text[start:end])
+            if name in ('header', 'contact'):
+                need = min(need, self.HEADER_TOKENS)
+            needs.append(need)
+
+        allocation = self._allocate([name for name, _, _ in spans], needs, budget)
+
+        parts = []
+        for (name, start, end), tokens in zip(spans, allocation):
+            if tokens <= 0:
+                continue
+            excerpt = self._truncate(text[start:end].strip(), tokens)
+            if excerpt:
+                parts.append(f"[{name.title()}]\n{excerpt}")
+
+        return '\n\n'.join(parts)
+
+    def format_score_context(self, ats_score, breakdown=None, missing_skills=None):
+        """
+        Summarize the ATS result for the prompt
+
+        Returns:
+            str: Score, per-component breakdown and missing skills
+        """
+        lines = [f"**Current ATS Score:** {ats_score}/100"]
+
+        if breakdown:
+            lines.append('**Score Breakdown:** ' + ', '.join(
+                f"{name.replace('_', ' ')} {value}/100" for name, value in breakdown.items()
+            ))
+
+        if missing_skills:
+            lines.append(f"**Missing Keywords:** {', '.join(missing_skills)}")
+
+        return '\n'.join(lines)
+
+    def _locate_sections(self, text, section_spans=None):
+        """
+        List the section spans, including the untitled block before the first one
+
+        Returns:
+            list: (name, start, end) spans in document order
+        """
+        if section_spans is None:
+            if self._parser is None:
+                self._parser = ResumeParser()
+            section_spans = self._parser.segment_sections(text)
+
+        if not section_spans:
+            return [('resume', 0, len(text))]
+
+        spans = []
+        if section_spans[0]['start'] > 0:
+            spans.append(('header', 0, section_spans[0]['start']))
+        for span in section_spans:
+            spans.append((span['section'], span['start'], span['end']))
+        return spans
+
+    def _allocate(self, names, needs, budget):
+        """Water-fill the budget across spans, favouring higher priority sections"""
+        pending = sorted(range(len(names)), key=lambda index: self.SECTION_PRIORITY.index(names[index]))
+        allocation = [0] * len(names)
+
+        while pending:
+            share = budget // len(pending)
+            satisfied = [index for index in pending if needs[index] <= share]
+            if not satisfied:
+                # Nobody fits: split evenly, remainder to the highest priority
+                for index in pending:
+                    allocation[index] = share
+                allocation[pending[0]] += budget - share * len(pending)
+                break
+            for index in satisfied:
+                allocation[index] = needs[index]
+                budget -= needs[index]
+                pending.remove(index)
+
+        return allocation
+
+    def _truncate(self, text, max_tokens):
+        """Cut text after the token that exhausts the budget"""
+        used = 0
+        for match in self.TOKEN_PATTERN.finditer(text):
+            used += 1 + (len(match.group()) - 1) // 6
+            if used > max_tokens:
+                return text[:match.start()].rstrip() + ' ...'
+        return text
@@ -0,0 +1,226 @@
+"""
+Result Cache Service
+Content-addressed LRU/TTL cache for parsed text, scores and AI suggestions
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Byte-capped in-memory LRU cache with an optional on-disk tier"""
+
+    def __init__(self, max_bytes=67108864, ttl=86400, disk_dir=None, disk_max_bytes=1073741824,
+                 disk_sweep_interval=300):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Memory budget for cached values (0 disables the cache)
+            ttl: Seconds an entry stays valid, in memory and on disk
+            disk_dir: Optional folder for a persistent tier that survives
+                restarts and is shared by all workers on the host
+            disk_max_bytes: Size budget of the disk tier; a sweep removes the
+                oldest entries once it is exceeded
+            disk_sweep_interval: Seconds between sweeps that delete expired
+                disk entries
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_sweep_interval = disk_sweep_interval
+        self.enabled = max_bytes > 0
+
+        self._entries = OrderedDict()  # (namespace, key) -> (expires_at, payload)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {}
+
+        # Disk usage as of the last sweep plus this process's writes since;
+        # other workers share the folder, so the periodic sweep re-measures it
+        self._disk_bytes = 0
+        self._next_sweep = 0
+        self._sweep_lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def hash_bytes(data):
+        """SHA-256 hex digest of raw bytes"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def make_key(*parts):
+        """Build a cache key from strings (e.g. text hash and taxonomy version)"""
+        return hashlib.sha256('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def get(self, namespace, key):
+        """
+        Look up a cached value
+
+        Returns:
+            The cached value (a fresh copy), or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end((namespace, key))
+                    self._count(namespace, 'hits')
+                    return json.loads(entry[1])
+                self._evict((namespace, key))
+
+        payload = self._read_disk(namespace, key, now)
+        with self._lock:
+            if payload is None:
+                self._count(namespace, 'misses')
+                return None
+            self._count(namespace, 'hits')
+            self._count(namespace, 'disk_hits')
+            self._store((namespace, key), payload, now + self.ttl)
+
+        return json.loads(payload)
+
+    def set(self, namespace, key, value):
+        """Cache a JSON-serializable value"""
+        if not self.enabled:
+            return
+
+        payload = json.dumps(value)
+        with self._lock:
+            self._store((namespace, key), payload, time.time() + self.ttl)
+        self._write_disk(namespace, key, payload)
+
+    def stats(self):
+        """Hit/miss counters per namespace plus current memory usage"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'disk_bytes': self._disk_bytes if self.disk_dir else None,
+                'disk_max_bytes': self.disk_max_bytes if self.disk_dir else None,
+                'namespaces': {name: dict(counters) for name, counters in self._stats.items()}
+            }
+
+    def _store(self, entry_key, payload, expires_at):
+        """Insert an entry and evict least-recently-used ones over budget"""
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        if entry_key in self._entries:
+            self._evict(entry_key)
+
+        self._entries[entry_key] = (expires_at, payload)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+            self._count(entry_key[0], 'evictions')
+
+    def _evict(self, entry_key):
+        """Remove one entry from memory"""
+        _, payload = self._entries.pop(entry_key)
+        self._bytes -= len(payload)
+
+    def _count(self, namespace, counter):
+        """Increment a per-namespace counter"""
+        counters = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'disk_hits': 0, 'evictions': 0})
+        counters[counter] += 1
+
+    def _disk_path(self, namespace, key):
+        """File path of an entry in the disk tier"""
+        return os.path.join(self.disk_dir, namespace, key[:2], key + '.json')
+
+    def _read_disk(self, namespace, key, now):
+        """Read an entry from the disk tier if present and not expired"""
+        if not self.disk_dir:
+            return None
+
+        path = self._disk_path(namespace, key)
+        try:
+            if os.path.getmtime(path) + self.ttl <= now:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, namespace, key, payload):
+        """Atomically write an entry to the disk tier"""
+        if not self.disk_dir:
+            return
+
+        path = self._disk_path(namespace, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write cache entry to disk: {str(e)}")
+            return
+
+        with self._lock:
+            self._disk_bytes += len(payload)
+            due = self._disk_bytes > self.disk_max_bytes or time.time() >= self._next_sweep
+        # Walking the whole tier is slow; the request that wrote returns now
+        if due and self._sweep_lock.acquire(blocking=False):
+            threading.Thread(target=self._sweep_disk, name='result-cache-sweep', daemon=True).start()
+
+    def _sweep_disk(self):
+        """Delete expired disk entries, then the oldest ones while over budget (holds _sweep_lock)"""
+        try:
+            now = time.time()
+            entries = []
+            for folder, _, filenames in os.walk(self.disk_dir):
+                for filename in filenames:
+                    path = os.path.join(folder, filename)
+                    try:
+                        info = os.stat(path)
+                    except OSError:
+                        continue
+                    # Leftover temp files of interrupted writes expire the same way
+                    if info.st_mtime + self.ttl <= now:
+                        self._remove_disk_file(path)
+                    else:
+                        entries.append((info.st_mtime, info.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            if total > self.disk_max_bytes:
+                # Keep the tier well under budget so the next sweep is not immediate
+                target = self.disk_max_bytes * 0.9
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    if self._remove_disk_file(path):
+                        total -= size
+
+            with self._lock:
+                self._disk_bytes = total
+                self._next_sweep = now + self.disk_sweep_interval
+        finally:
+            self._sweep_lock.release()
+
+    @staticmethod
+    def _remove_disk_file(path):
+        """Delete a disk entry (another worker may have removed it already)"""
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,185 @@
+"""
+Resume Store Service
+Persists parsed resumes in SQLite with an FTS5 index for skill search
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+class ResumeStore:
+    """Local parsed-resume store with boolean and phrase skill queries"""
+
+    # Bare query words; everything else (operators, quotes, parentheses) passes through
+    QUERY_TOKEN = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+    OPERATORS = {'AND', 'OR', 'NOT'}
+
+    def __init__(self, db_path):
+        """
+        Open (and create if needed) the store
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS resumes (
+                    id INTEGER PRIMARY KEY,
+                    content_hash TEXT NOT NULL UNIQUE,
+                    filename TEXT,
+                    text TEXT NOT NULL,
+                    sections TEXT NOT NULL,
+                    word_count INTEGER NOT NULL,
+                    keywords TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5(
+                    text, keywords, content='resumes', content_rowid='id'
+                );
+            ''')
+
+    def add(self, parsed_data, keywords, filename=None):
+        """
+        Index a parsed resume (identical text is stored only once)
+
+        Args:
+            parsed_data: Dictionary with 'text', 'sections', 'word_count'
+            keywords: Matched taxonomy keywords for the resume
+            filename: Optional original file name
+
+        Returns:
+            int: Id of the stored resume
+        """
+        text = parsed_data['text']
+        content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        keyword_text = ' | '.join(keywords)
+
+        with self._connect() as conn:
+            row = conn.execute('SELECT id FROM resumes WHERE content_hash = ?', (content_hash,)).fetchone()
+            if row is not None:
+                return row[0]
+
+            cursor = conn.execute(
+                '''INSERT INTO resumes (content_hash, filename, text, sections, word_count, keywords, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                (
+                    content_hash,
+                    filename,
+                    text,
+                    json.dumps(parsed_data['sections']),
+                    parsed_data['word_count'],
+                    keyword_text,
+                    time.time()
+                )
+            )
+            resume_id = cursor.lastrowid
+            conn.execute(
+                'INSERT INTO resumes_fts (rowid, text, keywords) VALUES (?, ?, ?)',
+                (resume_id, text, keyword_text)
+            )
+            return resume_id
+
+    def search(self, query, limit=20, offset=0):
+        """
+        Find resumes matching a skill query, best match first
+
+        Supports AND / OR / NOT, parentheses and "quoted phrases", e.g.
+        'kafka AND (kubernetes OR k8s) NOT "project manager"'.
+        Adjacent words are ANDed.
+
+        Returns:
+            list: Dicts with id, filename, word_count, keywords and a snippet
+        """
+        rows = self._connect().execute(
+            '''SELECT r.id, r.filename, r.word_count, r.keywords,
+                      snippet(resumes_fts, 0, '[', ']', '...', 12)
+               FROM resumes_fts JOIN resumes r ON r.id = resumes_fts.rowid
+               WHERE resumes_fts MATCH ?
+               ORDER BY bm25(resumes_fts)
+               LIMIT ? OFFSET ?''',
+            (self._to_fts_query(query), limit, offset)
+        ).fetchall()
+
+        return [
+            {
+                'id': row[0],
+                'filename': row[1],
+                'word_count': row[2],
+                'keywords': row[3].split(' | ') if row[3] else [],
+                'snippet': row[4]
+            }
+            for row in rows
+        ]
+
+    def iter_parsed(self, query=None, batch_size=500):
+        """
+        Yield stored resumes in the parsed_data shape, for re-scoring
+
+        Args:
+            query: Optional skill query restricting which resumes are returned
+            batch_size: Rows fetched per round trip
+        """
+        conn = self._connect()
+        if query:
+            cursor = conn.execute(
+                '''SELECT r.id, r.filename, r.text, r.sections, r.word_count
+                   FROM resumes_fts JOIN resumes r ON r.id = resumes_fts.rowid
+                   WHERE resumes_fts MATCH ?''',
+                (self._to_fts_query(query),)
+            )
+        else:
+            cursor = conn.execute('SELECT id, filename, text, sections, word_count FROM resumes')
+
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield {
+                    'id': row[0],
+                    'filename': row[1],
+                    'text': row[2],
+                    'sections': json.loads(row[3]),
+                    'word_count': row[4]
+                }
+
+    def count(self):
+        """Number of stored resumes"""
+        return self._connect().execute('SELECT COUNT(*) FROM resumes').fetchone()[0]
+
+    def _to_fts_query(self, query):
+        """
+        Translate a user skill query into FTS5 syntax
+
+        Bare words are quoted so terms like node.js, c++ or ci/cd are read as
+        phrases instead of FTS5 syntax errors.
+        """
+        parts = []
+        for token in self.QUERY_TOKEN.findall(query):
+            if token in self.OPERATORS or token in ('(', ')'):
+                parts.append(token)
+            elif token.startswith('"'):
+                parts.append(token if len(token) > 2 else '')
+            else:
+                parts.append('"' + token.replace('"', '') + '"')
+
+        fts_query = ' '.join(part for part in parts if part)
+        if not fts_query:
+            raise ValueError('Empty search query')
+        return fts_query
+
+    def _connect(self):
+        """Return this thread's SQLite connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
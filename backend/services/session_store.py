@@ -0,0 +1,95 @@
+"""
+Session Store Service
+Keeps the last parse and match state of each editing session in SQLite
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+
+class SessionStore:
+    """SQLite-backed editing sessions, shared by every worker process on the host"""
+
+    def __init__(self, db_path=None, ttl=3600):
+        """
+        Initialize the session store
+
+        Args:
+            db_path: SQLite file holding session state
+            ttl: Seconds an idle session is kept before cleanup
+        """
+        self.db_path = db_path or os.path.join(tempfile.gettempdir(), 'interats_sessions.db')
+        self.ttl = ttl
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
+    def create(self, state):
+        """
+        Start a session
+
+        Args:
+            state: JSON-serializable session state
+
+        Returns:
+            str: The new session id
+        """
+        session_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO sessions (id, state, updated_at) VALUES (?, ?, ?)',
+                (session_id, json.dumps(state), time.time())
+            )
+        self._cleanup()
+        return session_id
+
+    def get(self, session_id):
+        """
+        Return the state of a live session
+
+        Returns:
+            dict or None: The stored state, or None if unknown or expired
+        """
+        row = self._connect().execute(
+            'SELECT state, updated_at FROM sessions WHERE id = ?',
+            (session_id,)
+        ).fetchone()
+
+        if row is None or row[1] < time.time() - self.ttl:
+            return None
+
+        return json.loads(row[0])
+
+    def save(self, session_id, state):
+        """Replace the state of a session and refresh its expiry"""
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE sessions SET state = ?, updated_at = ? WHERE id = ?',
+                (json.dumps(state), time.time(), session_id)
+            )
+
+    def _cleanup(self):
+        """Drop sessions idle for longer than the TTL"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM sessions WHERE updated_at < ?', (time.time() - self.ttl,))
+
+    def _connect(self):
+        """Return this thread's SQLite connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
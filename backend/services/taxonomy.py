@@ -0,0 +1,262 @@
+"""
+Keyword Taxonomy Service
+Loads role-specific keyword taxonomies from disk and hot-reloads them on change
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+from services.keyword_matcher import KeywordMatcher
+
+
+class Taxonomy:
+    """A versioned keyword taxonomy with its precompiled matcher"""
+
+    def __init__(self, name, categories, aliases=None, version=None, keyword_target=None):
+        """
+        Build a taxonomy and compile its matcher
+
+        Args:
+            name: Taxonomy name (usually the role, e.g. 'backend-engineer')
+            categories: Dictionary mapping category name to a list of terms
+            aliases: Optional dictionary mapping alias to canonical term
+            version: Version string; derived from the content when omitted
+            keyword_target: Number of matched keywords that earns a full
+                keyword score (defaults to 30% of all keywords)
+        """
+        self.name = name
+        self.categories = {
+            category: self._unique([term.strip().lower() for term in terms if term.strip()])
+            for category, terms in categories.items()
+        }
+        self.aliases = {
+            alias.strip().lower(): term.strip().lower()
+            for alias, term in (aliases or {}).items()
+        }
+
+        self.all_keywords = self._unique(
+            [term for terms in self.categories.values() for term in terms]
+        )
+        self.keyword_target = keyword_target or max(len(self.all_keywords) * 0.30, 1)
+
+        self.version = version or self._content_version()
+        self.matcher = KeywordMatcher(self.categories, self.aliases)
+
+    @classmethod
+    def from_file(cls, path, name=None):
+        """
+        Load a taxonomy from a .json, .json.gz or .csv file
+
+        JSON layout:
+            {"name": ..., "version": ..., "keyword_target": ...,
+             "categories": {"technical": ["python", ...]},
+             "aliases": {"k8s": "kubernetes"}}
+
+        CSV layout (header required):
+            term,category,aliases
+            kubernetes,technical,k8s|kube
+
+        Raises:
+            ValueError: If the content is not a valid taxonomy
+            OSError: If the file cannot be read
+        """
+        with open(path, 'rb') as f:
+            raw = f.read()
+
+        try:
+            return cls._from_bytes(raw, path, name)
+        except (EOFError, csv.Error, AttributeError, TypeError) as e:
+            # Truncated gzip, broken CSV or JSON of the wrong shape
+            raise ValueError(f"Invalid taxonomy file {path}: {type(e).__name__}: {str(e)}") from e
+
+    @classmethod
+    def _from_bytes(cls, raw, path, name=None):
+        """Build a taxonomy from the raw content of a taxonomy file"""
+        filename = os.path.basename(path)
+        default_name = name or filename.split('.', 1)[0]
+
+        if filename.endswith('.json.gz'):
+            raw = gzip.decompress(raw)
+            filename = filename[:-3]
+
+        if filename.endswith('.json'):
+            data = json.loads(raw.decode('utf-8'))
+            return cls(
+                name=data.get('name', default_name),
+                categories=data.get('categories', {}),
+                aliases=data.get('aliases'),
+                version=data.get('version') or hashlib.sha256(raw).hexdigest()[:12],
+                keyword_target=data.get('keyword_target')
+            )
+
+        if filename.endswith('.csv'):
+            categories = {}
+            aliases = {}
+            for row in csv.DictReader(io.StringIO(raw.decode('utf-8-sig'))):
+                term = (row.get('term') or '').strip()
+                if not term:
+                    continue
+                categories.setdefault((row.get('category') or 'technical').strip(), []).append(term)
+                for alias in (row.get('aliases') or '').split('|'):
+                    if alias.strip():
+                        aliases[alias] = term
+            return cls(
+                name=default_name,
+                categories=categories,
+                aliases=aliases,
+                version=hashlib.sha256(raw).hexdigest()[:12]
+            )
+
+        raise ValueError(f"Unsupported taxonomy file: {path}")
+
+    def keywords(self, category):
+        """Return the terms of one category (empty if the taxonomy lacks it)"""
+        return self.categories.get(category, [])
+
+    def _content_version(self):
+        """Hash the terms and aliases so identical content gets the same version"""
+        payload = json.dumps([self.categories, self.aliases], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def _unique(items):
+        """De-duplicate while keeping the original order"""
+        return list(dict.fromkeys(items))
+
+
+class TaxonomyRegistry:
+    """
+    Directory of taxonomy files, reloaded when a file changes on disk
+
+    A changed file is recompiled on a background thread while requests keep
+    getting the last good taxonomy, since compiling tens of thousands of
+    terms takes seconds. A file that fails to load (half-written, invalid)
+    is logged and the last good version stays in service until the file
+    changes again.
+    """
+
+    EXTENSIONS = ('.json', '.json.gz', '.csv')
+
+    def __init__(self, directory=None, default=None, check_interval=5.0):
+        """
+        Initialize the registry
+
+        Args:
+            directory: Folder containing taxonomy files (one per role)
+            default: Taxonomy returned when no name is requested
+            check_interval: Seconds between modification-time checks per file
+        """
+        self.directory = directory
+        self.default = default
+        self.check_interval = check_interval
+        self._entries = {}  # name -> (path, mtime, checked_at, taxonomy)
+        self._reloading = set()  # names being recompiled in the background
+        self._load_locks = {}  # name -> lock held while its first version compiles
+        self._lock = threading.Lock()
+
+    def get(self, name=None):
+        """
+        Return the compiled taxonomy for a name, reloading it if its file changed
+
+        Raises:
+            KeyError: If no taxonomy with that name exists
+            ValueError: If the file has never loaded successfully (invalid
+                JSON or CSV content)
+            OSError: If the file cannot be read
+        """
+        if not name:
+            if self.default is None:
+                raise KeyError('No default taxonomy configured')
+            return self.default
+
+        path = self._find_file(name)
+        if path is None:
+            raise KeyError(f"Unknown taxonomy: {name}")
+
+        now = time.monotonic()
+        entry = self._entries.get(name)
+        if entry and entry[0] == path and now - entry[2] < self.check_interval:
+            return entry[3]
+
+        mtime = os.stat(path).st_mtime_ns
+        if entry and entry[0] == path and entry[1] == mtime:
+            self._entries[name] = (path, mtime, now, entry[3])
+            return entry[3]
+
+        if entry:
+            # Keep serving the previous version while the new one compiles
+            with self._lock:
+                if name not in self._reloading:
+                    self._reloading.add(name)
+                    threading.Thread(
+                        target=self._reload, args=(name, path, mtime), name=f'taxonomy-reload-{name}', daemon=True
+                    ).start()
+            return entry[3]
+
+        # A per-name lock, so a slow first compile only holds up requests for
+        # the same taxonomy
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            # Another thread may have loaded it while we waited
+            entry = self._entries.get(name)
+            if entry:
+                return entry[3]
+
+            taxonomy = Taxonomy.from_file(path, name=name)
+            with self._lock:
+                self._entries[name] = (path, mtime, now, taxonomy)
+            return taxonomy
+
+    def _reload(self, name, path, mtime):
+        """Recompile a changed file, keeping the last good taxonomy on failure"""
+        try:
+            taxonomy = Taxonomy.from_file(path, name=name)
+        except Exception as e:
+            print(f"Error reloading taxonomy {name} from {path}, keeping version "
+                  f"{self._entries[name][3].version}: {type(e).__name__}: {str(e)}")
+            # Remember the bad mtime so the file is only retried once it changes again
+            taxonomy = self._entries[name][3]
+
+        with self._lock:
+            self._entries[name] = (path, mtime, time.monotonic(), taxonomy)
+            self._reloading.discard(name)
+
+    def names(self):
+        """List the taxonomy names available in the directory"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+
+        names = set()
+        for filename in os.listdir(self.directory):
+            for extension in self.EXTENSIONS:
+                if filename.endswith(extension):
+                    names.add(filename[:-len(extension)])
+        return sorted(names)
+
+    def preload(self):
+        """Compile every taxonomy up front (e.g. before forking workers)"""
+        for name in self.names():
+            try:
+                self.get(name)
+            except (KeyError, ValueError, OSError) as e:
+                # A broken file fails its own requests, not the server start
+                print(f"Error preloading taxonomy {name}: {type(e).__name__}: {str(e)}")
+
+    def _find_file(self, name):
+        """Locate the file for a taxonomy name, rejecting path traversal"""
+        if not self.directory or os.path.basename(name) != name:
+            return None
+
+        for extension in self.EXTENSIONS:
+            path = os.path.join(self.directory, name + extension)
+            if os.path.isfile(path):
+                return path
+        return None
@@ -1,6 +1,8 @@
 import { useState, useRef } from 'react'
 import { analyzeResume } from '../services/api'
 
+const VALID_EXTENSIONS = ['.pdf', '.docx', '.odt', '.rtf', '.html', '.htm', '.txt', '.md', '.markdown']
+
 export default function UploadSection({ setResults, setLoading, loading }) {
   const [dragActive, setDragActive] = useState(false)
   const [error, setError] = useState(null)
@@ -38,9 +40,10 @@ export default function UploadSection({ setResults, setLoading, loading }) {
     setError(null)
     
     // Validate file type
-    const validTypes = ['application/pdf', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']
-    if (!validTypes.includes(file.type)) {
-      setError('Please upload a PDF or DOCX file')
+    // Browsers report inconsistent MIME types for ODT/RTF/Markdown, so check the extension
+    const extension = file.name.slice(file.name.lastIndexOf('.')).toLowerCase()
+    if (!VALID_EXTENSIONS.includes(extension)) {
+      setError('Please upload a PDF, DOCX, ODT, RTF, HTML or text file')
       return
     }
 
@@ -74,7 +77,7 @@ export default function UploadSection({ setResults, setLoading, loading }) {
           Upload Your Resume
         </h2>
         <p className="text-gray-600 mb-8 text-center">
-          Support for PDF and DOCX files • Maximum 5MB
+          Support for PDF, DOCX, ODT, RTF, HTML and text files • Maximum 5MB
         </p>
 
         {/* Upload area */}
@@ -93,7 +96,7 @@ export default function UploadSection({ setResults, setLoading, loading }) {
             ref={fileInputRef}
             type="file"
             className="hidden"
-            accept=".pdf,.docx"
+            accept={VALID_EXTENSIONS.join(',')}
             onChange={handleChange}
             disabled={loading}
           />
@@ -121,7 +124,7 @@ export default function UploadSection({ setResults, setLoading, loading }) {
                 {fileName || 'Drop your resume here, or click to browse'}
               </p>
               <p className="text-sm text-gray-500 mb-6">
-                PDF or DOCX up to 5MB
+                PDF, DOCX, ODT, RTF, HTML or TXT up to 5MB
               </p>
 
               <button